@@ -0,0 +1,8 @@
+"""Shared runtime for ARTBot protocols.
+
+Only the NumPy based helpers are re-exported here. The modules that build on
+the Opentrons protocol API (canvas, distribute, pipettes, runtime, tips) are
+imported directly, e.g. ``from artbot.runtime import draw_art``.
+"""
+from .art import ArtPiece, load_art, save_art
+from .paths import PathPlan, optimise_locations, optimise_order, path_length
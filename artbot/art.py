@@ -0,0 +1,186 @@
+"""On-disk format for ARTBot designs.
+
+An art file starts with a small fixed header and a JSON index, followed by
+float32 blocks with the x and y of every pixel, one block per colour and
+canvas. The z of ARTBot pixels is nearly always the same constant, so it is
+kept in the index and only written out as a block when it varies.
+
+    offset 0   4s   magic, b'ARTB'
+           4   H    format version
+           6   H    reserved
+           8   I    length of the JSON index in bytes
+          12        JSON index, padded to a multiple of 16 bytes
+                    float32 little endian blocks, each 16 byte aligned
+
+Files are opened with a read-only memory map, so loading a design costs a
+header read and the pixel data is only paged in when it is used.
+"""
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+ART_DIR = os.path.join(os.path.dirname(__file__), 'art')
+ART_SUFFIX = '.art'
+
+MAGIC = b'ARTB'
+FORMAT_VERSION = 2
+_PREAMBLE = struct.Struct('<4sHHI')
+_ALIGN = 16
+_FLOAT = np.dtype('<f4')
+
+
+class Pixels:
+    """The normalised pixels of one colour on one canvas.
+
+    x and y are float32 arrays, usually views into a memory-mapped art file.
+    z is an array or, when every pixel shares it, a single float. Converting
+    with ``np.asarray`` gives the usual (N, 3) array.
+    """
+    def __init__(self, x: np.ndarray, y: np.ndarray, z: Union[np.ndarray, float]) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @classmethod
+    def from_xyz(cls, pixels) -> 'Pixels':
+        """From (N, 3) data such as the list of tuples in a Protocol Builder
+        protocol. A single (x, y, z) tuple is a one pixel canvas."""
+        xyz = np.asarray(pixels, dtype=float).reshape(-1, 3)
+        z = xyz[:, 2]
+        if len(z) and np.all(z == z[0]):
+            z = float(z[0])
+        return cls(xyz[:, 0].astype(_FLOAT), xyz[:, 1].astype(_FLOAT), z if isinstance(z, float) else z.astype(_FLOAT))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        xyz = np.empty((len(self), 3), dtype=dtype or float)
+        xyz[:, 0] = self.x
+        xyz[:, 1] = self.y
+        xyz[:, 2] = self.z
+        return xyz
+
+
+class ArtPiece:
+    """Pixels of a design, keyed by colour and then by art title, and the
+    display name of each colour."""
+    def __init__(self, pixels_by_color_by_artpiece: Dict[str, Dict[str, Pixels]], color_map: Dict[str, str]) -> None:
+        self.pixels_by_color_by_artpiece = {
+            color: {
+                art_title: pixels if isinstance(pixels, Pixels) else Pixels.from_xyz(pixels)
+                for art_title, pixels in pixels_by_artpiece.items()
+            }
+            for color, pixels_by_artpiece in pixels_by_color_by_artpiece.items()
+        }
+        self.color_map = color_map
+
+    @property
+    def colors(self) -> List[str]:
+        return list(self.pixels_by_color_by_artpiece)
+
+    @property
+    def art_titles(self) -> List[str]:
+        titles: Dict[str, None] = {}
+        for pixels_by_artpiece in self.pixels_by_color_by_artpiece.values():
+            titles.update(dict.fromkeys(pixels_by_artpiece))
+        return list(titles)
+
+    def num_pixels(self, color: str) -> int:
+        return sum(len(pixels) for pixels in self.pixels_by_color_by_artpiece[color].values())
+
+
+def art_path(name: str) -> str:
+    """Paths are used as given; bare names refer to designs in artbot/art."""
+    if os.path.dirname(name) or name.endswith(ART_SUFFIX):
+        return name
+    return os.path.join(ART_DIR, name + ART_SUFFIX)
+
+
+def _padded(length: int) -> int:
+    return -(-length // _ALIGN) * _ALIGN
+
+
+def save_art(path: str, art: ArtPiece) -> None:
+    blocks: List[np.ndarray] = []
+    entries = []
+
+    def add_block(values: np.ndarray) -> int:
+        blocks.append(np.ascontiguousarray(values, dtype=_FLOAT))
+        return len(blocks) - 1
+
+    for color, pixels_by_artpiece in art.pixels_by_color_by_artpiece.items():
+        for art_title, pixels in pixels_by_artpiece.items():
+            entry = {
+                'color': color,
+                'art_title': art_title,
+                'count': len(pixels),
+                'x': add_block(pixels.x),
+                'y': add_block(pixels.y),
+            }
+            if isinstance(pixels.z, float):
+                entry['z_value'] = pixels.z
+            else:
+                entry['z'] = add_block(pixels.z)
+            entries.append(entry)
+
+    # block numbers become byte offsets once the index size is known; the
+    # index is re-encoded until its padded length stops changing
+    block_offsets: List[int] = []
+    index_length = 0
+    while True:
+        data_start = _padded(_PREAMBLE.size + index_length)
+        block_offsets = []
+        offset = data_start
+        for block in blocks:
+            block_offsets.append(offset)
+            offset += _padded(block.nbytes)
+        index = {
+            'color_map': art.color_map,
+            'pixels': [
+                {key: block_offsets[value] if key in ('x', 'y', 'z') else value for key, value in entry.items()}
+                for entry in entries
+            ],
+        }
+        encoded = json.dumps(index).encode()
+        if _padded(_PREAMBLE.size + len(encoded)) == data_start:
+            break
+        index_length = len(encoded)
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)))
+        f.write(encoded)
+        for block, offset in zip(blocks, block_offsets):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(block.tobytes())
+
+
+def load_art(name: str, mmap: bool = True) -> ArtPiece:
+    """Reads a design by name or path. With mmap the pixel arrays are
+    read-only views into the file; otherwise they are read into memory."""
+    path = art_path(name)
+    with open(path, 'rb') as f:
+        magic, version, _, index_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an art file')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'{path} has art format version {version}, expected {FORMAT_VERSION}')
+        index = json.loads(f.read(index_length).decode())
+
+    data: np.ndarray = np.memmap(path, dtype=np.uint8, mode='r') if mmap else np.fromfile(path, dtype=np.uint8)
+
+    def block(offset: int, count: int) -> np.ndarray:
+        return data[offset:offset + count * _FLOAT.itemsize].view(_FLOAT)
+
+    pixels_by_color_by_artpiece: Dict[str, Dict[str, Pixels]] = {}
+    for entry in index['pixels']:
+        count = entry['count']
+        z: Optional[Union[np.ndarray, float]] = entry.get('z_value')
+        if z is None:
+            z = block(entry['z'], count)
+        pixels = Pixels(block(entry['x'], count), block(entry['y'], count), z)
+        pixels_by_color_by_artpiece.setdefault(entry['color'], {})[entry['art_title']] = pixels
+    return ArtPiece(pixels_by_color_by_artpiece, index['color_map'])
@@ -0,0 +1,161 @@
+"""Simulates many ARTBot protocols at once and reports which ones pass.
+
+    python -m artbot.batch [protocols or directories...] [-j 8] [--timeout 120] [-o report.json]
+
+With no arguments every ``.py`` file in test_protocols is run. Protocols are
+simulated in a pool of worker processes, one per core by default. Each
+worker imports the Opentrons stack and reads the custom labware, through
+artbot.labware, once, and then simulates protocol after protocol with the
+parsed definitions. A protocol still running after ``--timeout`` seconds is
+stopped and reported as failed, and so is one whose worker dies. A dead
+worker breaks the whole pool, so the protocols it left unfinished are run
+again in a new pool of the same size. Only if that one breaks too are the
+rest run in a pool of one worker, where the first of them to break it is
+the one that died; the protocols after it go back to a full pool.
+
+The timeout is an alarm signal, SIGALRM, which only Unix has. Elsewhere,
+e.g. on Windows, protocols run without a time limit and a note says so.
+
+Every protocol gets the figures of artbot.benchmark: whether it passed and
+why not, the simulation time, the estimated robot run time, tips and the
+volume aspirated and dispensed. The report is printed as a table with a
+summary and written as JSON or CSV with ``-o``. The exit status is 1 when any
+protocol failed.
+"""
+import argparse
+import glob
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence
+
+from .benchmark import TEST_PROTOCOLS, BenchmarkResult, benchmark_protocol, write_report
+from .labware import default_registry
+
+# the custom labware of a worker process, parsed once when it starts
+_extra_labware: Optional[Dict[str, dict]] = None
+
+# timeouts need an alarm signal, which Windows does not have
+HAS_TIMEOUT = hasattr(signal, 'SIGALRM')
+
+
+class SimulationTimeout(Exception):
+    pass
+
+
+def _start_worker(labware_paths: Optional[List[str]]) -> None:
+    global _extra_labware
+    _extra_labware = default_registry(labware_paths).extra_labware()
+
+
+def _on_alarm(signum, frame) -> None:
+    raise SimulationTimeout('simulation timed out')
+
+
+def simulate_one(path: str, timeout: Optional[float] = None) -> BenchmarkResult:
+    """Simulates one protocol in a worker, stopping it after timeout seconds
+    where there is SIGALRM, see HAS_TIMEOUT."""
+    timeout = timeout if HAS_TIMEOUT else None
+    if timeout:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = benchmark_protocol(path, extra_labware=_extra_labware)
+    except SimulationTimeout as e:
+        # benchmark_protocol reports a timeout during the simulation as a
+        # failed result, matched below; this is an alarm outside its try
+        result = BenchmarkResult(os.path.basename(path), ok=False, error=f'{type(e).__name__}: {e}')
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    if not result.ok and 'SimulationTimeout' in result.error:
+        result.error = f'timed out after {timeout:g} s'
+    return result
+
+
+def find_protocols(paths: Sequence[str]) -> List[str]:
+    """The protocol files given, with directories replaced by their .py files."""
+    protocols = []
+    for path in paths:
+        if os.path.isdir(path):
+            protocols.extend(sorted(glob.glob(os.path.join(path, '*.py'))))
+        else:
+            protocols.append(path)
+    return protocols
+
+
+def run_batch(protocols: Sequence[str], jobs: Optional[int] = None, timeout: Optional[float] = 120,
+              labware_paths: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """Simulates protocols in jobs processes, by default one per core, and
+    returns their results in the same order."""
+    results: List[Optional[BenchmarkResult]] = [None] * len(protocols)
+    pending = list(range(len(protocols)))
+    breaks = 0
+    while pending:
+        # a pool that broke twice in a row is down to one worker to find out why
+        workers = 1 if breaks >= 2 else jobs
+        unfinished = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(labware_paths,)) as pool:
+            futures = [(i, pool.submit(simulate_one, protocols[i], timeout)) for i in pending]
+            for i, future in futures:
+                try:
+                    results[i] = future.result()
+                except BrokenProcessPool:
+                    unfinished.append(i)
+        if unfinished and workers == 1:
+            # one worker runs the protocols in order, so the first left is the one it died on
+            died = unfinished.pop(0)
+            results[died] = BenchmarkResult(os.path.basename(protocols[died]), ok=False, error='worker process died')
+            breaks = 0
+        elif unfinished:
+            breaks += 1
+        pending = unfinished
+    return results
+
+
+def format_summary(results: Sequence[BenchmarkResult], wall_seconds: float, jobs: int) -> str:
+    lines = [f'{"protocol":40} {"":4} {"sim s":>7} {"run min":>8} {"tips":>5} {"aspirated uL":>13} {"dispensed uL":>13}']
+    for result in results:
+        if result.ok:
+            lines.append(
+                f'{result.protocol:40} {"pass":4} {result.sim_seconds:7.2f} {result.estimated_seconds / 60:8.1f} '
+                f'{result.tips:5d} {result.aspirated_ul:13.1f} {result.dispensed_ul:13.1f}'
+            )
+        else:
+            lines.append(f'{result.protocol:40} {"FAIL":4} {result.error}')
+    passed = sum(result.ok for result in results)
+    simulated = sum(result.sim_seconds for result in results)
+    lines.append(
+        f'{passed} passed, {len(results) - passed} failed in {wall_seconds:.1f} s on {jobs} process{"es" if jobs != 1 else ""} '
+        f'({simulated:.1f} s of simulation)'
+    )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('protocols', nargs='*', help='protocol files or directories (default: test_protocols)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes (default: one per core)')
+    parser.add_argument('-t', '--timeout', type=float, default=120, help='seconds each protocol may take, 0 for no limit')
+    parser.add_argument('-L', '--custom-labware-path', action='append', dest='labware_paths',
+                        help='directory of custom labware definitions (default: test_protocols)')
+    parser.add_argument('-o', '--output', help='report file to write, .json or .csv')
+    args = parser.parse_args()
+
+    protocols = find_protocols(args.protocols or [TEST_PROTOCOLS])
+    if args.timeout and not HAS_TIMEOUT:
+        print('No SIGALRM on this platform, so protocols run without --timeout', file=sys.stderr)
+    started = time.perf_counter()
+    results = run_batch(protocols, args.jobs, args.timeout or None, args.labware_paths)
+    print(format_summary(results, time.perf_counter() - started, args.jobs))
+    if args.output:
+        write_report(results, args.output)
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
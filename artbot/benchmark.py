@@ -0,0 +1,231 @@
+"""Simulates ARTBot protocols offline and reports how they compare.
+
+    python -m artbot.benchmark [protocols...] [-o report.json] [--baseline old.json]
+
+With no protocols given every ``.py`` file in test_protocols is run. Each
+protocol goes through ``opentrons.simulate.simulate`` with the custom labware
+of its own directory, and the report has, per protocol:
+
+- the wall clock time of the simulation (the best of ``--repeat`` runs),
+- the number of commands and the count of each kind, and the tips used,
+- the gantry travel, as straight lines between consecutive command targets,
+- the robot run time, in total and per colour, from artbot.estimate,
+- the volume aspirated and dispensed.
+
+The report is written as JSON or, for a ``.csv`` output, one row per protocol.
+Passing an earlier report as ``--baseline`` prints the change in every figure
+so regressions between commits, or between the Original and 8Channel variants,
+stand out. The repository root has to be on the Python path, as for
+``opentrons_simulate``.
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from opentrons import simulate
+from opentrons.protocols import parse
+from opentrons.types import Location
+
+from .compat import PRIVATE_API
+from .estimate import RobotModel, estimate_run
+
+TEST_PROTOCOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_protocols')
+
+# figures compared against a baseline report, in table order
+FIGURES = ('sim_seconds', 'num_commands', 'tips', 'travel_mm', 'estimated_seconds')
+
+# liquid handled in the run, per channel, reported but not compared
+VOLUMES = ('aspirated_ul', 'dispensed_ul')
+
+
+class CommandRecorder:
+    """Broker listener that keeps every completed command message.
+
+    ``simulate`` subscribes its duration estimator to the protocol's broker;
+    the recorder takes that place so the full payloads, with their locations,
+    are kept rather than only the text of the run log.
+    """
+    def __init__(self) -> None:
+        self.messages: List[dict] = []
+
+    def on_message(self, message: dict) -> None:
+        if message['$'] == 'after':
+            self.messages.append(message)
+
+
+def command_name(message: dict) -> str:
+    """'command.PICK_UP_TIP' -> 'pick_up_tip'"""
+    return message['name'].split('.', 1)[-1].lower()
+
+
+def target_point(message: dict):
+    """The deck point a command moves the pipette to, or None. Tips are
+    picked up and dropped at the top of their well."""
+    location = message['payload'].get('location')
+    if location is None:
+        return None
+    if isinstance(location, Location):
+        return location.point
+    return location.top().point
+
+
+def travel_distance(messages: Sequence[dict]) -> float:
+    """Straight line distance between consecutive command targets, in mm."""
+    distance = 0.0
+    previous = None
+    for message in messages:
+        point = target_point(message)
+        if point is None:
+            continue
+        if previous is not None:
+            distance += point.magnitude_to(previous)
+        previous = point
+    return distance
+
+
+def record_commands(path: str, labware_paths: Optional[List[str]] = None,
+                    extra_labware: Optional[Dict[str, dict]] = None) -> List[dict]:
+    """Simulates the protocol at path and returns its completed command
+    messages. Custom labware is read from labware_paths, by default the
+    directory of the protocol, or given already parsed as extra_labware,
+    labware definitions by URI, to save reading it for every protocol.
+    extra_labware is only used with the release in artbot.compat; other
+    releases read labware_paths."""
+    if labware_paths is None:
+        labware_paths = [os.path.dirname(os.path.abspath(path))]
+    recorder = CommandRecorder()
+    with open(path) as f:
+        if extra_labware is None or not PRIVATE_API:
+            simulate.simulate(f, os.path.basename(path), custom_labware_paths=labware_paths, duration_estimator=recorder)
+            return recorder.messages
+        protocol = parse.parse(f.read(), os.path.basename(path), extra_labware=extra_labware)
+        if protocol.api_level >= simulate.ENGINE_CORE_API_VERSION:
+            # Protocol Engine runs only take labware paths
+            f.seek(0)
+            simulate.simulate(f, os.path.basename(path), custom_labware_paths=labware_paths, duration_estimator=recorder)
+            return recorder.messages
+    # what simulate does for protocols below the Protocol Engine API level,
+    # in the release of artbot.compat; simulate itself only takes paths
+    logger = logging.getLogger('opentrons')
+    logger.propagate = False
+    with simulate._make_hardware_simulator_cm(None, protocol.robot_type) as hardware:
+        simulate._run_file_non_pe(protocol, hardware, logger, 'warning', recorder)
+    return recorder.messages
+
+
+@dataclass
+class BenchmarkResult:
+    protocol: str
+    ok: bool = True
+    error: str = ''
+    sim_seconds: float = 0.0
+    num_commands: int = 0
+    tips: int = 0
+    travel_mm: float = 0.0
+    estimated_seconds: float = 0.0
+    aspirated_ul: float = 0.0
+    dispensed_ul: float = 0.0
+    commands: Dict[str, int] = field(default_factory=dict)
+    estimated_seconds_by_colour: Dict[str, float] = field(default_factory=dict)
+
+
+def benchmark_protocol(path: str, labware_paths: Optional[List[str]] = None, repeat: int = 1,
+                       model: Optional[RobotModel] = None, extra_labware: Optional[Dict[str, dict]] = None) -> BenchmarkResult:
+    """Simulates the protocol at path repeat times, see record_commands. The
+    wall clock time is the fastest run; the other figures come from the last."""
+    result = BenchmarkResult(os.path.basename(path))
+    best = float('inf')
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            messages = record_commands(path, labware_paths, extra_labware)
+            best = min(best, time.perf_counter() - started)
+    except Exception as e:
+        result.ok = False
+        result.error = f'{type(e).__name__}: {e}'
+        return result
+    result.sim_seconds = best
+    result.num_commands = len(messages)
+    result.commands = dict(Counter(command_name(message) for message in messages))
+    result.tips = result.commands.get('pick_up_tip', 0)
+    result.travel_mm = travel_distance(messages)
+    result.aspirated_ul = sum(message['payload']['volume'] for message in messages if message['name'] == 'command.ASPIRATE')
+    result.dispensed_ul = sum(message['payload']['volume'] for message in messages if message['name'] == 'command.DISPENSE')
+    estimate = estimate_run(messages, model)
+    result.estimated_seconds = estimate.total_seconds
+    result.estimated_seconds_by_colour = estimate.seconds_by_colour
+    return result
+
+
+def write_report(results: Sequence[BenchmarkResult], path: str) -> None:
+    if path.endswith('.csv'):
+        kinds = sorted({kind for result in results for kind in result.commands})
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['protocol', 'ok', 'error', *FIGURES, *VOLUMES, *kinds])
+            for result in results:
+                writer.writerow([
+                    result.protocol, result.ok, result.error,
+                    *(getattr(result, figure) for figure in (*FIGURES, *VOLUMES)),
+                    *(result.commands.get(kind, 0) for kind in kinds),
+                ])
+    else:
+        with open(path, 'w') as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+
+def read_report(path: str) -> Dict[str, dict]:
+    """A JSON report keyed by protocol file name."""
+    with open(path) as f:
+        return {entry['protocol']: entry for entry in json.load(f)}
+
+
+def format_table(results: Sequence[BenchmarkResult], baseline: Optional[Dict[str, dict]] = None) -> str:
+    lines = [f'{"protocol":40} {"sim s":>8} {"commands":>9} {"tips":>5} {"travel mm":>10} {"est. s":>9}']
+    for result in results:
+        if not result.ok:
+            lines.append(f'{result.protocol:40} FAILED {result.error}')
+            continue
+        lines.append(
+            f'{result.protocol:40} {result.sim_seconds:8.2f} {result.num_commands:9d} {result.tips:5d} '
+            f'{result.travel_mm:10.0f} {result.estimated_seconds:9.0f}'
+        )
+        previous = (baseline or {}).get(result.protocol)
+        if previous and previous.get('ok'):
+            # reports from before tips were a figure still have the command counts
+            previous.setdefault('tips', previous['commands'].get('pick_up_tip', 0))
+            deltas = [getattr(result, figure) - previous[figure] for figure in FIGURES]
+            lines.append(f'{"  vs baseline":40} {deltas[0]:+8.2f} {deltas[1]:+9d} {deltas[2]:+5d} {deltas[3]:+10.0f} {deltas[4]:+9.0f}')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('protocols', nargs='*', help='protocol files (default: every protocol in test_protocols)')
+    parser.add_argument('-L', '--custom-labware-path', action='append', dest='labware_paths',
+                        help='directory of custom labware definitions (default: the directory of each protocol)')
+    parser.add_argument('-o', '--output', help='report file to write, .json or .csv')
+    parser.add_argument('-b', '--baseline', help='an earlier JSON report to compare against')
+    parser.add_argument('-n', '--repeat', type=int, default=1, help='simulate each protocol n times and keep the fastest')
+    args = parser.parse_args()
+
+    protocols = args.protocols or sorted(glob.glob(os.path.join(TEST_PROTOCOLS, '*.py')))
+    results = [benchmark_protocol(protocol, args.labware_paths, args.repeat) for protocol in protocols]
+    baseline = read_report(args.baseline) if args.baseline else None
+    print(format_table(results, baseline))
+    if args.output:
+        write_report(results, args.output)
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
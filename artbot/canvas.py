@@ -0,0 +1,83 @@
+"""Pixel to deck coordinate conversion for whole canvases at once.
+
+ARTBot pixels are given as (x, y, z) from the centre of the canvas well, in
+fractions of its half sizes like ``Well.from_center_cartesian``, except that
+x and y are both fractions of the smaller half size. A design keeps its
+shape on a well that is not square, such as a lane of the replicate tray,
+and stays centred in it; on a round plate the two are the same. Rather than
+calling into the protocol API once per pixel, the well's centre and half sizes
+are read once and every pixel is converted with a single NumPy expression.
+"""
+from typing import Iterator, List, Sequence, Union
+
+import numpy as np
+
+from opentrons.types import Location, Point
+
+
+def canvas_scale(half_size: Sequence[float]) -> np.ndarray:
+    """The mm per normalised unit along x, y and z on a well of half_size."""
+    half_size = np.asarray(half_size, dtype=float)
+    side = min(half_size[0], half_size[1])
+    return np.array([side, side, half_size[2]])
+
+
+def canvas_points(well, pixels) -> np.ndarray:
+    """Deck coordinates, shape (N, 3), for normalised pixels of shape (N, 3).
+
+    A single (x, y, z) tuple is accepted as a one pixel canvas.
+    """
+    pixels = np.asarray(pixels, dtype=float).reshape(-1, 3)
+    center = well.from_center_cartesian(0, 0, 0)
+    corner = well.from_center_cartesian(1, 1, 1)
+    origin = np.array([center.x, center.y, center.z])
+    half_size = np.array([corner.x, corner.y, corner.z]) - origin
+    return origin + pixels * canvas_scale(half_size)
+
+
+class CanvasLocations(Sequence):
+    """A read only sequence of dispense Locations backed by a NumPy array.
+
+    Each Location is only built when it is indexed or iterated over, e.g. when
+    ``distribute_to_agar`` moves the pipette there.
+    """
+    def __init__(self, points: np.ndarray, labware: Sequence, labware_index: np.ndarray) -> None:
+        self.points = points
+        self.labware = tuple(labware)
+        self.labware_index = labware_index
+
+    @classmethod
+    def from_pixels(cls, canvas, pixels) -> 'CanvasLocations':
+        """Locations for normalised pixels on the first well of a canvas labware."""
+        points = canvas_points(canvas.wells()[0], pixels)
+        return cls(points, (canvas,), np.zeros(len(points), dtype=np.intp))
+
+    @classmethod
+    def concatenate(cls, parts: List['CanvasLocations']) -> 'CanvasLocations':
+        """Joins the locations of several canvases, keeping their order."""
+        labware: List = []
+        indices = []
+        for part in parts:
+            offset = len(labware)
+            labware.extend(part.labware)
+            indices.append(part.labware_index + offset)
+        if not parts:
+            return cls(np.empty((0, 3)), (), np.empty(0, dtype=np.intp))
+        return cls(np.concatenate([part.points for part in parts]), labware, np.concatenate(indices))
+
+    def reordered(self, order) -> 'CanvasLocations':
+        """The same locations visited in the given order."""
+        return CanvasLocations(self.points[order], self.labware, self.labware_index[order])
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return self.reordered(np.arange(len(self))[index])
+        x, y, z = self.points[index]
+        return Location(point=Point(float(x), float(y), float(z)), labware=self.labware[self.labware_index[index]])
+
+    def __iter__(self) -> Iterator[Location]:
+        for i in range(len(self)):
+            yield self[i]
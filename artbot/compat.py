@@ -0,0 +1,15 @@
+"""The one Opentrons release whose private code artbot relies on.
+
+artbot.benchmark runs protocols through the helpers opentrons.simulate uses
+internally, so that custom labware parsed once can be passed in, and
+artbot.strokes moves the gantry and a plunger together through the hardware
+controller. Neither is public API. Both were written against Opentrons
+7.0.x and use it only when PRIVATE_API says that release is installed, so a
+new release is taken up by changing PINNED_RELEASE here after checking both.
+"""
+from opentrons import __version__ as OPENTRONS_VERSION
+
+# the release series the private calls were written against
+PINNED_RELEASE = '7.0'
+
+PRIVATE_API = OPENTRONS_VERSION.startswith(PINNED_RELEASE + '.')
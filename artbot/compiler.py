@@ -0,0 +1,175 @@
+"""Compiles an ARTBot design to a flat list of robot commands ahead of time.
+
+    python -m artbot.compiler description.json [-o program.json]
+    python -m artbot.compiler artbot/programs/seans-name.json
+
+A description is JSON with the name of an art file and the keyword arguments
+of draw_art:
+
+    {"art": "seans-name", "canvas_locations": {"seans-name#1": "5"},
+     "pipette_name": "p10_multi", "dispense_amount": 0.4, "touch_tip_v_offset": -15}
+
+The compiler runs draw_art against a simulated OT-2, so every plan, path and
+coordinate is worked out the same way as in a protocol, and keeps the
+commands it sends. Moves to where the pipette already is are dropped, and a
+move followed by an aspirate or dispense there becomes one command. The result
+is a program for artbot.replay: a protocol that replays it does no planning
+on the robot, and the same design always compiles to the same file, so two
+versions of a design or of the planner can be compared with diff. A program
+keeps its description, and passing a program recompiles it.
+"""
+import argparse
+import inspect
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+from opentrons import simulate
+from opentrons.commands import types as command_types
+
+from .art import load_art
+from .labware import default_registry
+from .replay import PROGRAM_DIR, PROGRAM_SUFFIX
+from .runtime import draw_art
+
+API_LEVEL = '2.8'
+
+# coordinates are kept to the micrometre, which keeps programs diffable
+_DECIMALS = 3
+
+_TOUCH_TIP_V_OFFSET = inspect.signature(draw_art).parameters['touch_tip_v_offset'].default
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.messages: List[dict] = []
+
+    def on_message(self, message: dict) -> None:
+        if message['$'] == 'after':
+            self.messages.append(message)
+
+
+def _point(location) -> list:
+    """[x, y, z, slot, well] for a Location or a Well."""
+    if not hasattr(location, 'point'):
+        location = location.top()
+    labware, well = location.labware.get_parent_labware_and_well()
+    point = location.point
+    return [round(point.x, _DECIMALS), round(point.y, _DECIMALS), round(point.z, _DECIMALS),
+            str(labware.parent), well.well_name if well is not None else None]
+
+
+def flatten(messages: Sequence[dict], touch_tip_v_offset: float = _TOUCH_TIP_V_OFFSET) -> List[list]:
+    """Program commands for completed command messages, in order.
+
+    touch_tip messages do not carry their offset, so every touch_tip is
+    given touch_tip_v_offset, the only one draw_art uses.
+    """
+    commands: List[list] = []
+    position: Dict[str, Optional[list]] = {}
+    for message in messages:
+        name = message['name'].split('.', 1)[-1].lower()
+        payload = message['payload']
+        if name == 'comment':
+            commands.append(['comment', payload['text']])
+            continue
+        mount = payload['instrument'].mount
+        location = payload.get('location')
+        point = _point(location) if location is not None else None
+        if name == 'move_to':
+            if point != position.get(mount):
+                commands.append(['move_to', mount, point])
+                position[mount] = point
+        elif payload.get('stroke_from') is not None:
+            # a dispense made on the move, from where the pipette is
+            commands.append(['stroke', mount, payload['volume'], payload.get('rate', 1.0), point])
+            position[mount] = point
+        elif name in ('aspirate', 'dispense'):
+            if point is None or point == position.get(mount):
+                point = None
+                # aspirate and dispense make the move to a location themselves
+                if commands and commands[-1][:2] == ['move_to', mount]:
+                    point = commands.pop()[2]
+            commands.append([name, mount, payload['volume'], payload.get('rate', 1.0), point])
+            if point is not None:
+                position[mount] = point
+        elif name == 'touch_tip':
+            commands.append(['touch_tip', mount, touch_tip_v_offset])
+            position[mount] = None
+        elif name == 'pick_up_tip':
+            commands.append(['pick_up_tip', mount, point[3], point[4]])
+            position[mount] = None
+        elif name == 'drop_tip':
+            commands.append(['drop_tip', mount])
+            position[mount] = None
+        else:
+            raise ValueError(f'cannot compile a {name} command')
+        # the OT-2 retracts the other mount before this one moves
+        for other in position:
+            if other != mount:
+                position[other] = None
+    return commands
+
+
+def compile_art(description: dict, labware_paths: Optional[Sequence[str]] = None) -> dict:
+    """The program for a design description, with the custom labware in
+    labware_paths, by default the registry's, see artbot.labware."""
+    protocol = simulate.get_protocol_api(
+        description.get('api_level', API_LEVEL),
+        extra_labware=default_registry(labware_paths).extra_labware(),
+    )
+    recorder = _Recorder()
+    protocol.broker.subscribe(command_types.COMMAND, recorder.on_message)
+
+    kwargs = {key: value for key, value in description.items() if key not in ('art', 'api_level')}
+    draw_art(protocol, load_art(description['art']), **kwargs)
+
+    trash = protocol.fixed_trash
+    labware = {
+        str(slot): item.load_name for slot, item in sorted(protocol.loaded_labwares.items(), key=lambda item: int(item[0]))
+        if item is not trash
+    }
+    pipettes = {
+        mount: {
+            'name': pipette.name,
+            'tip_racks': [str(rack.parent) for rack in pipette.tip_racks],
+            'replicates': getattr(pipette, 'num_tips', 1),
+        }
+        for mount, pipette in protocol.loaded_instruments.items() if pipette is not None
+    }
+    commands = flatten(recorder.messages, kwargs.get('touch_tip_v_offset', _TOUCH_TIP_V_OFFSET))
+    return {'description': description, 'labware': labware, 'pipettes': pipettes, 'commands': commands}
+
+
+def save_program(program: dict, path: str) -> None:
+    """Writes program as JSON with one command per line."""
+    head = {key: value for key, value in program.items() if key != 'commands'}
+    lines = [json.dumps(head, indent=1)[:-2] + ',', ' "commands": [']
+    lines.extend(f'  {json.dumps(command)},' for command in program['commands'])
+    lines[-1] = lines[-1].rstrip(',')
+    lines.append(' ]')
+    lines.append('}')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('description', help='design description or program to recompile, .json')
+    parser.add_argument('-o', '--output', help=f'program file to write (default: {os.path.relpath(PROGRAM_DIR)}/<art>{PROGRAM_SUFFIX})')
+    parser.add_argument('-L', '--custom-labware-path', action='append', dest='labware_paths',
+                        help='directory of custom labware definitions (default: test_protocols)')
+    args = parser.parse_args()
+
+    with open(args.description) as f:
+        description = json.load(f)
+    # a program carries the description it was compiled from
+    description = description.get('description', description)
+    program = compile_art(description, args.labware_paths)
+    output = args.output or os.path.join(PROGRAM_DIR, description['art'] + PROGRAM_SUFFIX)
+    save_program(program, output)
+    print(f'{output}: {len(program["commands"])} commands')
+
+
+if __name__ == '__main__':
+    main()
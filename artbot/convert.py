@@ -0,0 +1,72 @@
+"""Extracts the inline design from an ARTBot Protocol Builder protocol.
+
+    python -m artbot.convert protocol.py [-o design.art]
+    python -m artbot.convert protocols/*.py -d artbot/art
+
+The protocols generated at bioartbot.org carry their design as literals
+assigned to ``pixels_by_color_by_artpiece`` and ``color_map`` inside
+``run()``. They are read with ``ast.literal_eval``, so the protocol is never
+executed. A pixel listed again for the same colour and canvas is dropped,
+found by its lattice cell, see artbot.lattice.
+"""
+import argparse
+import ast
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .art import ART_SUFFIX, ArtPiece, Pixels, save_art
+from .lattice import unique_pixels
+
+
+def extract_art(source: str) -> ArtPiece:
+    literals: Dict[str, object] = {}
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in ('pixels_by_color_by_artpiece', 'color_map'):
+                literals[name] = ast.literal_eval(node.value)
+    if 'pixels_by_color_by_artpiece' not in literals:
+        raise ValueError('no pixels_by_color_by_artpiece literal found')
+    return ArtPiece(literals['pixels_by_color_by_artpiece'], literals.get('color_map', {}))
+
+
+def drop_duplicates(art: ArtPiece) -> Tuple[ArtPiece, int]:
+    """art without the pixels that repeat one of the same colour and canvas,
+    and how many were dropped."""
+    dropped = 0
+    pixels_by_color_by_artpiece: Dict[str, Dict[str, Pixels]] = {}
+    for color, pixels_by_artpiece in art.pixels_by_color_by_artpiece.items():
+        for art_title, pixels in pixels_by_artpiece.items():
+            keep = unique_pixels(np.asarray(pixels))
+            dropped += len(pixels) - len(keep)
+            if len(keep) < len(pixels):
+                pixels = Pixels.from_xyz(np.asarray(pixels)[keep])
+            pixels_by_color_by_artpiece.setdefault(color, {})[art_title] = pixels
+    return ArtPiece(pixels_by_color_by_artpiece, art.color_map), dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('protocols', nargs='+', help='protocol files with an inline design')
+    parser.add_argument('-o', '--output', help='art file to write, for a single protocol')
+    parser.add_argument('-d', '--directory', help='directory to write the art files to (default: next to each protocol)')
+    args = parser.parse_args()
+    if args.output and len(args.protocols) > 1:
+        parser.error('--output needs a single protocol, use --directory')
+
+    for protocol in args.protocols:
+        with open(protocol) as f:
+            art, dropped = drop_duplicates(extract_art(f.read()))
+        output = args.output
+        if output is None:
+            stem = os.path.splitext(os.path.basename(protocol))[0] + ART_SUFFIX
+            output = os.path.join(args.directory or os.path.dirname(protocol), stem)
+        save_art(output, art)
+        print(f'{output}: {len(art.colors)} colours, {sum(art.num_pixels(c) for c in art.colors)} pixels'
+              + (f', {dropped} duplicates dropped' if dropped else ''))
+
+
+if __name__ == '__main__':
+    main()
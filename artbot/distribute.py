@@ -0,0 +1,104 @@
+"""Dispensing one colour onto the agar canvases."""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from opentrons.types import Location, Point
+
+from .canvas import CanvasLocations
+from .planning import DistributionPlan, Refill, plan_distribution
+from .strokes import find_strokes, lattice_cells, stroke
+
+
+def _refill(pipette, refill: Refill, source, touch_tip: bool, touch_tip_v_offset: float) -> None:
+    if refill.new_tip:
+        if pipette.has_tip: pipette.drop_tip()
+        pipette.pick_up_tip()
+
+    # topping up to the planned fill keeps rounding in the pipette's
+    # tracked volume from adding up over refills
+    pipette.aspirate(refill.fill_volume - pipette.current_volume, source)
+    if touch_tip:
+        pipette.touch_tip(source, v_offset=touch_tip_v_offset)
+
+
+def _in_canvas(location) -> Location:
+    """location addressed to the canvas well, which its pixels are placed on.
+    The OT-2 moves straight between two points in the same well."""
+    labware, well = location.labware.get_parent_labware_and_well()
+    return Location(location.point, well if well is not None else labware.wells()[0])
+
+
+def _canvas_points(dest) -> Tuple[np.ndarray, np.ndarray]:
+    """The points of dest and, for each, a number shared by the points on
+    the same labware."""
+    if isinstance(dest, CanvasLocations):
+        return dest.points, dest.labware_index
+    points = np.array([[location.point.x, location.point.y, location.point.z] for location in dest]).reshape(-1, 3)
+    return points, np.array([id(location.labware.object) for location in dest], dtype=np.int64)
+
+
+def _stroke_lattice(dest) -> Tuple[np.ndarray, np.ndarray]:
+    return lattice_cells(*_canvas_points(dest))
+
+
+def _dispense(pipette, refill: Refill, dest, vol, hover_height: Optional[float] = None,
+              strokes: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> None:
+    if strokes is None:
+        runs = [(i, i + 1) for i in range(refill.start, refill.stop)]
+    else:
+        cells, groups = strokes
+        runs = find_strokes(cells, groups, refill.start, refill.stop)
+    previous = None
+    for first, stop in runs:
+        location = dest[first]
+        if hover_height is None:
+            pipette.move_to(location)
+        else:
+            location = _in_canvas(location)
+            if previous is not None and previous.labware.object is location.labware.object:
+                # up, across and down hover_height over the higher pixel
+                # rather than an arc over the plate's rim
+                z = max(previous.point.z, location.point.z) + hover_height
+                pipette.move_to(Location(Point(previous.point.x, previous.point.y, z), location.labware.object))
+                pipette.move_to(Location(Point(location.point.x, location.point.y, z), location.labware.object))
+            pipette.move_to(location)
+        if stop - first > 1:
+            location = _in_canvas(dest[stop - 1])
+            stroke(pipette, vol * (stop - first), location)
+        else:
+            pipette.dispense(vol)
+        previous = location
+
+
+def distribute_to_agar(pipette, vol, source, destination, disposal_vol, touch_tip_below: Optional[float] = None, touch_tip_v_offset: float = -1.0, plan: Optional[DistributionPlan] = None,
+                       hover_height: Optional[float] = None, strokes: bool = False):
+    """Dispenses vol at every location in destination, refilling from source.
+
+    The refills and tip changes come from plan, which is made with
+    artbot.planning.plan_distribution when not given. After each aspiration
+    the tip is touched off on the source, at touch_tip_v_offset mm from the
+    top, to avoid blotches from liquid stuck to the outside of the tip. With
+    touch_tip_below set, that only happens when vol is smaller than it.
+
+    The pipette arcs over the canvas rim between pixels. With hover_height
+    it instead rises that many mm over the pixels, moves across and comes
+    straight down, and only arcs when it comes from somewhere else. The
+    locations have to be on canvases, as from artbot.canvas.
+
+    With strokes, pixels one lattice step apart that follow each other in a
+    straight line are drawn as a line in one moving dispense, see
+    artbot.strokes; the locations have to be on canvases then too.
+    """
+    dest = destination if hasattr(destination, '__getitem__') else list(destination)  # allows for non-lists
+    if plan is None:
+        plan = plan_distribution(len(dest), vol, pipette.max_volume, disposal_vol)
+
+    touch_tip = touch_tip_below is None or vol < touch_tip_below
+    lattice = _stroke_lattice(dest) if strokes else None
+    for refill in plan.refills:
+        _refill(pipette, refill, source, touch_tip, touch_tip_v_offset)
+        _dispense(pipette, refill, dest, vol, hover_height, lattice)
+
+    if pipette.has_tip:
+        pipette.drop_tip()
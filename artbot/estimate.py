@@ -0,0 +1,290 @@
+"""Robot run time of an ARTBot protocol, estimated from its simulated commands.
+
+    python -m artbot.estimate protocol.py [--xy-speed 400] [--xy-acceleration 2000] ...
+
+The estimate walks the command messages recorded while simulating (see
+artbot.benchmark) and adds up:
+
+- gantry moves, planned like the OT-2 plans them: a straight move within a
+  well, an arc 5 mm over the labware within one labware and an arc 10 mm over
+  the tallest labware of the run otherwise. Every leg accelerates and
+  decelerates at a constant rate up to the axis speed limit.
+- plunger strokes, at the pipette's flow rate times the command's rate, plus
+  a fixed settling time for each aspirate and dispense. A dispense drawn as
+  a line (see artbot.strokes) moves the gantry at the same time and takes
+  whichever of the two is longer.
+- touch_tip, as the five edge moves around the source well at touch speed.
+- tip pick up, a fixed time per press (EightToSingleChannelPipette presses
+  once, other pipettes three times) and tip drop.
+- with two pipettes, retracting one mount before the other pipette moves.
+
+Each command is charged to a colour: the source well its pipette aspirates from.
+Picking up a tip is charged to the colour it is picked up for. The colour
+names come from the "name -> well" comments draw_art writes at the start of
+the run.
+"""
+import argparse
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from opentrons.types import Location, Point
+
+from .pipettes import EightToSingleChannelPipette
+
+# the touch_tip edges: right, left, centre, up, down
+_TOUCH_TIP_EDGES = ((1, 0), (-1, 0), (0, 0), (0, 1), (0, -1))
+
+
+@dataclass
+class RobotModel:
+    """Speeds in mm/s, accelerations in mm/s^2 and times in seconds. The
+    defaults are the OT-2's default Y axis (the slower of X and Y) and Z
+    axis limits."""
+    xy_speed: float = 400
+    xy_acceleration: float = 2000
+    z_speed: float = 125
+    z_acceleration: float = 1500
+    in_labware_arc_margin: float = 5
+    general_arc_margin: float = 10
+    touch_tip_speed: float = 60
+    touch_tip_radius: float = 1.0
+    # None uses the flow rates of the pipette that ran the command
+    aspirate_flow_rate: Optional[float] = None
+    dispense_flow_rate: Optional[float] = None
+    plunger_settle_seconds: float = 0.2
+    pick_up_press_seconds: float = 1.0
+    pick_up_presses: Optional[int] = None
+    drop_tip_seconds: float = 1.5
+    # height of the tip end when its mount is retracted, which happens to
+    # one mount before the other moves
+    retract_z: float = 170
+
+
+@dataclass
+class RunEstimate:
+    total_seconds: float = 0.0
+    seconds_by_colour: Dict[str, float] = field(default_factory=dict)
+    seconds_by_command: Dict[str, float] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        lines = [f'total: {_minutes(self.total_seconds)}']
+        lines.extend(f'{colour}: {_minutes(seconds)}' for colour, seconds in self.seconds_by_colour.items())
+        return '\n'.join(lines)
+
+
+def _minutes(seconds: float) -> str:
+    return f'{int(seconds // 60)} min {seconds % 60:04.1f} s'
+
+
+def axis_seconds(distance: float, speed: float, acceleration: float) -> float:
+    """Time for a move of distance from rest to rest with a trapezoidal
+    velocity profile; short moves never reach speed."""
+    distance = abs(distance)
+    if distance * acceleration < speed * speed:
+        return 2 * math.sqrt(distance / acceleration)
+    return distance / speed + speed / acceleration
+
+
+def _labware_and_well(location) -> Tuple[object, object]:
+    if isinstance(location, Location):
+        return location.labware.get_parent_labware_and_well()
+    return location.parent, location
+
+
+def _target(location) -> Point:
+    """Tips are picked up and dropped at the top of their well."""
+    return location.point if isinstance(location, Location) else location.top().point
+
+
+def _colour_names(messages: Sequence[dict]) -> Dict[str, str]:
+    """Source well -> colour name, from draw_art's 'name -> well' comments."""
+    names = {}
+    for message in messages:
+        if message['name'] == 'command.COMMENT' and ' -> ' in message['payload']['text']:
+            name, well = message['payload']['text'].rsplit(' -> ', 1)
+            names[well] = name
+    return names
+
+
+def _source_colours(messages: Sequence[dict]) -> List[Optional[str]]:
+    """The source well each command is charged to, followed separately for
+    each pipette."""
+    sources: List[Optional[str]] = [None] * len(messages)
+    upcoming: Dict[object, Optional[str]] = {}
+    for i in reversed(range(len(messages))):
+        instrument = id(messages[i]['payload'].get('instrument'))
+        if messages[i]['name'] == 'command.ASPIRATE':
+            upcoming[instrument] = str(_labware_and_well(messages[i]['payload']['location'])[1])
+        sources[i] = upcoming.get(instrument)
+    current: Dict[object, Optional[str]] = {}
+    for i, message in enumerate(messages):
+        instrument = id(message['payload'].get('instrument'))
+        if message['name'] in ('command.PICK_UP_TIP', 'command.ASPIRATE') or current.get(instrument) is None:
+            current[instrument] = sources[i]
+        sources[i] = current[instrument]
+    return sources
+
+
+class RunTimeEstimator:
+    """Replays command messages against a RobotModel."""
+    def __init__(self, model: Optional[RobotModel] = None) -> None:
+        self.model = model or RobotModel()
+        self._position: Optional[Point] = None
+        self._location = None
+        self._instrument = None
+        self._safe_z = 0.0
+
+    def move_seconds(self, location) -> float:
+        """Moves the pipette to location and returns how long it took."""
+        model = self.model
+        target = _target(location)
+        previous, self._position = self._position, target
+        previous_location, self._location = self._location, location
+        if previous is None:
+            return 0.0
+        xy = math.hypot(target.x - previous.x, target.y - previous.y)
+        from_labware, from_well = _labware_and_well(previous_location) if previous_location is not None else (None, None)
+        to_labware, to_well = _labware_and_well(location)
+        if from_well is not None and from_well == to_well:
+            return max(axis_seconds(xy, model.xy_speed, model.xy_acceleration),
+                       axis_seconds(target.z - previous.z, model.z_speed, model.z_acceleration))
+        if to_labware is not None and to_labware == from_labware:
+            travel_z = to_labware.highest_z + model.in_labware_arc_margin
+        else:
+            travel_z = self._safe_z + model.general_arc_margin
+        travel_z = max(travel_z, previous.z, target.z)
+        return (
+            axis_seconds(travel_z - previous.z, model.z_speed, model.z_acceleration)
+            + axis_seconds(xy, model.xy_speed, model.xy_acceleration)
+            + axis_seconds(travel_z - target.z, model.z_speed, model.z_acceleration)
+        )
+
+    def plunger_seconds(self, payload: dict, flow_rate: Optional[float], kind: str) -> float:
+        if flow_rate is None:
+            flow_rate = getattr(payload['instrument'].flow_rate, kind)
+        return payload['volume'] / (flow_rate * payload.get('rate', 1.0)) + self.model.plunger_settle_seconds
+
+    def stroke_seconds(self, payload: dict, flow_rate: Optional[float]) -> float:
+        """A dispense made while the gantry moves straight from stroke_from
+        to its location, after a move to stroke_from if it is elsewhere."""
+        model = self.model
+        start, target = payload['stroke_from'].point, _target(payload['location'])
+        seconds = self.move_seconds(payload['stroke_from']) if start != self._position else 0.0
+        self._position, self._location = target, payload['location']
+        xy = math.hypot(target.x - start.x, target.y - start.y)
+        return seconds + max(axis_seconds(xy, model.xy_speed, model.xy_acceleration) + model.plunger_settle_seconds,
+                             self.plunger_seconds(payload, flow_rate, 'dispense'))
+
+    def touch_tip_seconds(self) -> float:
+        """The five edge moves at the top of the well touch_tip was called
+        for, which is the well the pipette is in."""
+        model = self.model
+        well = _labware_and_well(self._location)[1] if self._location is not None else None
+        if well is None:
+            return 0.0
+        corner = well.from_center_cartesian(1, 1, 0)
+        centre = well.from_center_cartesian(0, 0, 0)
+        half = ((corner.x - centre.x) * model.touch_tip_radius, (corner.y - centre.y) * model.touch_tip_radius)
+        edges = [(centre.x + dx * half[0], centre.y + dy * half[1]) for dx, dy in _TOUCH_TIP_EDGES]
+        # up to the top of the well, around the edges, then the next move
+        # starts from the top
+        seconds = axis_seconds(well.top().point.z - self._position.z, model.z_speed, model.z_acceleration)
+        previous = (self._position.x, self._position.y)
+        for edge in edges:
+            seconds += axis_seconds(math.hypot(edge[0] - previous[0], edge[1] - previous[1]),
+                                    model.touch_tip_speed, model.xy_acceleration)
+            previous = edge
+        self._position = Point(previous[0], previous[1], well.top().point.z)
+        return seconds
+
+    def retract_seconds(self, instrument) -> float:
+        """Retracts the mount in use when the other pipette is about to move.
+        The gantry is shared, so the other pipette starts where this one was."""
+        previous, self._instrument = self._instrument, instrument
+        if previous is None or instrument is previous or self._position is None:
+            return 0.0
+        model = self.model
+        seconds = axis_seconds(model.retract_z - self._position.z, model.z_speed, model.z_acceleration)
+        self._position = Point(self._position.x, self._position.y, max(model.retract_z, self._position.z))
+        self._location = None
+        return seconds
+
+    def pick_up_tip_seconds(self, payload: dict) -> float:
+        presses = self.model.pick_up_presses
+        if presses is None:
+            presses = 1 if isinstance(payload['instrument'], EightToSingleChannelPipette) else 3
+        return presses * self.model.pick_up_press_seconds
+
+    def command_seconds(self, message: dict) -> float:
+        name = message['name']
+        payload = message['payload']
+        location = payload.get('location')
+        seconds = 0.0
+        if payload.get('instrument') is not None:
+            seconds += self.retract_seconds(payload['instrument'])
+        if payload.get('stroke_from') is not None:
+            return seconds + self.stroke_seconds(payload, self.model.dispense_flow_rate)
+        # aspirate and dispense report where the pipette is when they are
+        # made in place, which is no move at all
+        in_place = name in ('command.ASPIRATE', 'command.DISPENSE') and location is not None and _target(location) == self._position
+        if location is not None and not in_place:
+            seconds += self.move_seconds(location)
+        if name == 'command.ASPIRATE':
+            seconds += self.plunger_seconds(payload, self.model.aspirate_flow_rate, 'aspirate')
+        elif name == 'command.DISPENSE':
+            seconds += self.plunger_seconds(payload, self.model.dispense_flow_rate, 'dispense')
+        elif name == 'command.TOUCH_TIP':
+            seconds += self.touch_tip_seconds()
+        elif name == 'command.PICK_UP_TIP':
+            seconds += self.pick_up_tip_seconds(payload)
+        elif name == 'command.DROP_TIP':
+            seconds += self.model.drop_tip_seconds
+        return seconds
+
+    def estimate(self, messages: Sequence[dict]) -> RunEstimate:
+        """Estimates a run from its completed command messages, in order."""
+        self._position = None
+        self._location = None
+        self._instrument = None
+        self._safe_z = max(
+            (labware.highest_z for labware in (
+                _labware_and_well(message['payload']['location'])[0]
+                for message in messages if message['payload'].get('location') is not None
+            ) if labware is not None),
+            default=0.0,
+        )
+        names = _colour_names(messages)
+        by_colour: Dict[str, float] = defaultdict(float)
+        by_command: Dict[str, float] = defaultdict(float)
+        for message, source in zip(messages, _source_colours(messages)):
+            seconds = self.command_seconds(message)
+            by_colour[names.get(source, source)] += seconds
+            by_command[message['name'].split('.', 1)[-1].lower()] += seconds
+        by_colour.pop(None, None)
+        return RunEstimate(sum(by_command.values()), dict(by_colour), dict(by_command))
+
+
+def estimate_run(messages: Sequence[dict], model: Optional[RobotModel] = None) -> RunEstimate:
+    return RunTimeEstimator(model).estimate(messages)
+
+
+def main() -> None:
+    from .benchmark import record_commands
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('protocol', help='protocol file to simulate')
+    parser.add_argument('-L', '--custom-labware-path', action='append', dest='labware_paths',
+                        help='directory of custom labware definitions (default: the directory of the protocol)')
+    defaults = RobotModel()
+    for name, value in vars(defaults).items():
+        parser.add_argument('--' + name.replace('_', '-'), type=float if name != 'pick_up_presses' else int, default=value)
+    args = parser.parse_args()
+
+    model = RobotModel(**{name: getattr(args, name) for name in vars(defaults)})
+    print(estimate_run(record_commands(args.protocol, args.labware_paths), model).describe())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Opt-in timing of the liquid handling calls of a pipette.
+
+PipetteInstrumentation wraps aspirate, dispense, move_to, touch_tip,
+pick_up_tip and drop_tip on one pipette instance, so a pipette that is not
+instrumented runs the plain InstrumentContext methods. Each call is timed with
+``time.perf_counter`` and filed under the colour being drawn and the canvas
+the pipette is over, with a count, total, maximum and a latency histogram.
+
+    instrumentation = PipetteInstrumentation(canvas_names={plate: 'art#1'})
+    instrumentation.attach(pipette)
+    instrumentation.colour = 'pink'
+    ...
+    instrumentation.export('timings.json')
+
+draw_art does this when given an ``instrumentation_path``.
+"""
+import bisect
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from opentrons.types import Location
+
+COMMANDS = ('aspirate', 'dispense', 'move_to', 'touch_tip', 'pick_up_tip', 'drop_tip')
+
+# upper bounds of the histogram buckets in seconds, the last bucket is open
+DEFAULT_BUCKETS = (0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0)
+
+# where a call happens when it is not over a named canvas
+OFF_CANVAS = '-'
+
+
+@dataclass
+class LatencyStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    histogram: List[int] = field(default_factory=list)
+
+    def add(self, seconds: float, buckets: Sequence[float]) -> None:
+        if not self.histogram:
+            self.histogram = [0] * (len(buckets) + 1)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.histogram[bisect.bisect_left(buckets, seconds)] += 1
+
+    def merge(self, other: 'LatencyStats') -> None:
+        if not self.histogram:
+            self.histogram = [0] * len(other.histogram)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+def _call_location(command: str, args: tuple, kwargs: dict):
+    """The location argument of a pipette call, or None."""
+    if 'location' in kwargs:
+        return kwargs['location']
+    # aspirate and dispense take the volume first
+    position = 1 if command in ('aspirate', 'dispense') else 0
+    return args[position] if len(args) > position else None
+
+
+def _labware_of(location):
+    if isinstance(location, Location):
+        return location.labware.get_parent_labware_and_well()[0]
+    return getattr(location, 'parent', None)
+
+
+class PipetteInstrumentation:
+    """Times the liquid handling calls of the pipettes it is attached to.
+
+    canvas_names maps canvas labware to the name the canvas is reported as.
+    The canvas of a call is the canvas its location is on; a call without a
+    location, such as a dispense after move_to, happens wherever the pipette
+    last went, except tip pick ups and drops, which are never on a canvas.
+    colour is set by the caller before each colour is drawn.
+    """
+    def __init__(self, canvas_names: Optional[Dict[object, str]] = None, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 clock: Callable[[], float] = time.perf_counter) -> None:
+        self.canvas_names = dict(canvas_names or {})
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self.colour: Optional[str] = None
+        self.canvas = OFF_CANVAS
+        self.stats: Dict[Tuple[str, str, str], LatencyStats] = {}
+        self._depth = 0
+
+    def attach(self, pipette) -> None:
+        for command in COMMANDS:
+            setattr(pipette, command, self._timed(command, getattr(pipette, command)))
+
+    def _timed(self, command: str, method: Callable) -> Callable:
+        @wraps(method)
+        def timed(*args, **kwargs):
+            # calls made from inside another timed call are part of its time
+            if self._depth:
+                return method(*args, **kwargs)
+            location = _call_location(command, args, kwargs)
+            if location is not None:
+                self.canvas = self.canvas_names.get(_labware_of(location), OFF_CANVAS)
+            elif command in ('pick_up_tip', 'drop_tip'):
+                # the tip rack or the trash
+                self.canvas = OFF_CANVAS
+            self._depth += 1
+            started = self.clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                self.record(command, self.clock() - started)
+        return timed
+
+    def record(self, command: str, seconds: float) -> None:
+        key = (command, self.colour or OFF_CANVAS, self.canvas)
+        if key not in self.stats:
+            self.stats[key] = LatencyStats()
+        self.stats[key].add(seconds, self.buckets)
+
+    def grouped(self, by: str) -> Dict[Tuple[str, str], LatencyStats]:
+        """Stats per (colour or canvas, command); by is 'colour' or 'canvas'."""
+        position = {'colour': 1, 'canvas': 2}[by]
+        groups: Dict[Tuple[str, str], LatencyStats] = {}
+        for key, stats in self.stats.items():
+            group = (key[position], key[0])
+            if group not in groups:
+                groups[group] = LatencyStats()
+            groups[group].merge(stats)
+        return groups
+
+    def rows(self) -> List[dict]:
+        """One row per colour and command, then one per canvas and command."""
+        rows = []
+        for by in ('colour', 'canvas'):
+            for (name, command), stats in self.grouped(by).items():
+                rows.append({
+                    'group': by, 'name': name, 'command': command, 'count': stats.count,
+                    'total_s': stats.total, 'mean_s': stats.mean, 'max_s': stats.max,
+                    'histogram': stats.histogram,
+                })
+        return rows
+
+    def export(self, path: str) -> None:
+        """Writes the stats as JSON or, for a .csv path, one row per group
+        and command with a column per histogram bucket."""
+        rows = self.rows()
+        if path.endswith('.csv'):
+            bucket_names = [f'le_{bound:g}s' for bound in self.buckets] + [f'gt_{self.buckets[-1]:g}s']
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['group', 'name', 'command', 'count', 'total_s', 'mean_s', 'max_s', *bucket_names])
+                for row in rows:
+                    writer.writerow([*(row[column] for column in list(row)[:-1]), *row['histogram']])
+        else:
+            with open(path, 'w') as f:
+                json.dump({'buckets': list(self.buckets), 'stats': rows}, f, indent=2)
@@ -0,0 +1,133 @@
+"""The custom labware of the ARTBot protocols, read once per process.
+
+LabwareRegistry finds the labware definitions in a list of directories,
+checks each against the Opentrons labware schema and keeps it parsed. A
+protocol gets its labware from the registry with load_labware, which hands
+the definition to ``load_labware_from_definition`` so no labware directory
+has to be passed to the simulator, and falls back to the standard labware
+for other names. Tools that work without a ProtocolContext take the well
+layout from geometry: the wells in plate order and their centres and half
+sizes as arrays, relative to the corner of the deck slot.
+
+    registry = default_registry()
+    palette = load_labware(protocol, 'cryo_35_tuberack_2000ul', 11)
+    geometry = registry.geometry('bioartbot_petriplate_90mm_round')
+"""
+import glob
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from opentrons.protocols.labware import verify_definition
+
+# where the definitions are kept in this repository
+LABWARE_PATHS = (os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_protocols'),)
+
+
+@dataclass(frozen=True)
+class LabwareGeometry:
+    """The wells of a labware in plate order, as ``Labware.wells()`` gives
+    them. centres are the middle of each well's volume, and half_sizes
+    half its width, length and depth, in the convention of
+    ``Well.from_center_cartesian``."""
+    load_name: str
+    wells: Tuple[str, ...]
+    centres: np.ndarray
+    half_sizes: np.ndarray
+    highest_z: float
+    quirks: Tuple[str, ...]
+
+    @classmethod
+    def from_definition(cls, definition: dict) -> 'LabwareGeometry':
+        wells = tuple(name for column in definition['ordering'] for name in column)
+        offset = definition['cornerOffsetFromSlot']
+        centres = np.empty((len(wells), 3))
+        half_sizes = np.empty((len(wells), 3))
+        for i, name in enumerate(wells):
+            well = definition['wells'][name]
+            centres[i] = (offset['x'] + well['x'], offset['y'] + well['y'], offset['z'] + well['z'] + well['depth'] / 2)
+            if well['shape'] == 'circular':
+                half_sizes[i] = (well['diameter'] / 2, well['diameter'] / 2, well['depth'] / 2)
+            else:
+                half_sizes[i] = (well['xDimension'] / 2, well['yDimension'] / 2, well['depth'] / 2)
+        centres.flags.writeable = False
+        half_sizes.flags.writeable = False
+        return cls(
+            definition['parameters']['loadName'], wells, centres, half_sizes,
+            offset['z'] + definition['dimensions']['zDimension'], tuple(definition['parameters'].get('quirks', ())),
+        )
+
+    def index(self, well: str) -> int:
+        return self.wells.index(well)
+
+
+class LabwareRegistry:
+    """The labware definitions found in paths, by load name. When two files
+    define the same load name the first, in directory and file name order,
+    is used."""
+    def __init__(self, paths: Sequence[str] = LABWARE_PATHS) -> None:
+        self.paths = tuple(paths)
+        self.definitions: Dict[str, dict] = {}
+        self.files: Dict[str, str] = {}
+        # later files defining a load name already found, which are not used
+        self.shadowed: Dict[str, List[str]] = {}
+        self._geometry: Dict[str, LabwareGeometry] = {}
+        for directory in self.paths:
+            for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+                with open(path, 'rb') as f:
+                    try:
+                        definition = verify_definition(f.read())
+                    except Exception as e:
+                        raise ValueError(f'{path} is not a valid labware definition: {getattr(e, "message", e)}') from e
+                load_name = definition['parameters']['loadName']
+                if load_name in self.definitions:
+                    self.shadowed.setdefault(load_name, []).append(path)
+                    continue
+                self.definitions[load_name] = definition
+                self.files[load_name] = path
+
+    def __contains__(self, load_name: str) -> bool:
+        return load_name in self.definitions
+
+    def definition(self, load_name: str) -> dict:
+        return self.definitions[load_name]
+
+    def geometry(self, load_name: str) -> LabwareGeometry:
+        if load_name not in self._geometry:
+            self._geometry[load_name] = LabwareGeometry.from_definition(self.definitions[load_name])
+        return self._geometry[load_name]
+
+    def uri(self, load_name: str) -> str:
+        definition = self.definitions[load_name]
+        return f'{definition["namespace"]}/{load_name}/{definition["version"]}'
+
+    def extra_labware(self) -> Dict[str, dict]:
+        """Every definition by labware URI, the form ``opentrons.simulate``
+        takes custom labware in."""
+        return {self.uri(load_name): definition for load_name, definition in self.definitions.items()}
+
+    def load(self, protocol, load_name: str, location: Union[int, str], label: Optional[str] = None):
+        """Loads load_name into a deck slot from its definition, or as standard
+        labware when it is not in the registry."""
+        if load_name in self.definitions:
+            return protocol.load_labware_from_definition(self.definitions[load_name], location, label)
+        return protocol.load_labware(load_name, location, label)
+
+
+@lru_cache(maxsize=None)
+def _registry(paths: Tuple[str, ...]) -> LabwareRegistry:
+    return LabwareRegistry(paths)
+
+
+def default_registry(paths: Optional[List[str]] = None) -> LabwareRegistry:
+    """The registry for paths, by default LABWARE_PATHS, made once per
+    process. Directories that do not exist, such as test_protocols on a
+    robot, are skipped."""
+    return _registry(tuple(path for path in (paths or LABWARE_PATHS) if os.path.isdir(path)))
+
+
+def load_labware(protocol, load_name: str, location: Union[int, str], label: Optional[str] = None):
+    return default_registry().load(protocol, load_name, location, label)
@@ -0,0 +1,151 @@
+"""Pixels as integer cells of a square lattice, and a hash grid to find them.
+
+ARTBot designs are drawn on a grid, so every pixel coordinate is an origin
+plus a whole number of pixel pitches: 0.0566 in normalised canvas units,
+2.26 mm on a 90 mm plate. Lattice finds the pitch and origin of a set of
+points and encodes them as integer (col, row) cells, where neighbouring
+pixels differ by one and the same pixel is the same cell, with no float
+tolerances after that.
+
+GridIndex files points by cell in a dict, so the points in or around a cell
+are found in constant time. With the cells of a Lattice each pixel has a
+cell of its own and the index finds duplicates and neighbours; with cells
+of any size over arbitrary points it is a spatial hash for nearest
+neighbour searches, as in artbot.paths.
+
+    lattice = Lattice.infer(xy)
+    cells = lattice.encode(xy)
+    index = GridIndex(cells)
+    index.duplicates          # points repeating an earlier point's cell
+    index.around((3, 7))      # points in the 3 x 3 cells around (3, 7)
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# how far off the lattice a point may be, as a fraction of the pitch
+TOLERANCE = 0.05
+
+
+@dataclass(frozen=True)
+class Lattice:
+    """The square lattice of points origin + (col, row) * pitch."""
+    pitch: float
+    origin: Tuple[float, float]
+
+    @classmethod
+    def infer(cls, xy: np.ndarray) -> 'Lattice':
+        """The lattice of the points xy: the pitch is the smallest gap
+        between two x or two y coordinates, leaving out gaps that are only
+        rounding, and the origin the smallest x and y. Raises ValueError
+        when the points are not on it."""
+        xy = np.asarray(xy, dtype=float)[:, :2]
+        if not len(xy):
+            raise ValueError('no points to find a lattice in')
+        # gaps smaller than this are float rounding, e.g. of float32 pixels
+        resolution = 1e-6 * max(1.0, float(np.abs(xy).max()))
+        gaps = np.concatenate([np.diff(np.unique(xy[:, 0])), np.diff(np.unique(xy[:, 1]))])
+        gaps = gaps[gaps > resolution]
+        if len(gaps):
+            gaps = gaps[gaps >= TOLERANCE * np.median(gaps)]
+        lattice = cls(float(gaps.min()) if len(gaps) else 1.0, (float(xy[:, 0].min()), float(xy[:, 1].min())))
+        lattice.encode(xy)
+        return lattice
+
+    def encode(self, xy: np.ndarray) -> np.ndarray:
+        """The (N, 2) integer cells of the points xy. Raises ValueError for
+        points that are not on the lattice."""
+        steps = (np.asarray(xy, dtype=float)[:, :2] - self.origin) / self.pitch
+        cells = np.rint(steps)
+        off = np.abs(steps - cells).max(axis=1, initial=0) > TOLERANCE
+        if off.any():
+            i = int(np.argmax(off))
+            raise ValueError(f'{int(off.sum())} points are not on a lattice of pitch {self.pitch:g}, '
+                             f'e.g. ({xy[i][0]:g}, {xy[i][1]:g})')
+        return cells.astype(np.int64)
+
+    def decode(self, cells: np.ndarray) -> np.ndarray:
+        """The (N, 2) points of integer cells."""
+        return np.asarray(self.origin) + np.asarray(cells, dtype=float) * self.pitch
+
+
+def grid_cells(xy: np.ndarray, size: float) -> np.ndarray:
+    """The cells of a grid of squares of side size that the points xy fall in."""
+    return np.floor(np.asarray(xy, dtype=float)[:, :2] / size).astype(np.int64)
+
+
+class GridIndex:
+    """The indices of points by their (col, row) cell, in the order given."""
+    def __init__(self, cells: np.ndarray) -> None:
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        # points in a cell that an earlier point is already in
+        self.duplicates: List[int] = []
+        for i, cell in enumerate(map(tuple, np.asarray(cells).tolist())):
+            points = self.cells.get(cell)
+            if points is None:
+                self.cells[cell] = [i]
+            else:
+                points.append(i)
+                self.duplicates.append(i)
+
+    def __len__(self) -> int:
+        """The number of cells with a point in them."""
+        return len(self.cells)
+
+    def __getitem__(self, cell: Tuple[int, int]) -> List[int]:
+        return self.cells.get(cell, [])
+
+    def first(self) -> np.ndarray:
+        """The first point in every cell, in the order of the points."""
+        return np.array(sorted(points[0] for points in self.cells.values()), dtype=np.intp)
+
+    def ring(self, cell: Tuple[int, int], radius: int) -> Iterator[int]:
+        """The points in the cells radius cells away from cell in columns or
+        rows, or in cell itself for radius 0."""
+        col, row = cell
+        if radius == 0:
+            yield from self[cell]
+            return
+        for i in range(-radius, radius + 1):
+            for neighbour in ((col + i, row - radius), (col + i, row + radius)):
+                yield from self.cells.get(neighbour, ())
+        for i in range(-radius + 1, radius):
+            for neighbour in ((col - radius, row + i), (col + radius, row + i)):
+                yield from self.cells.get(neighbour, ())
+
+    def around(self, cell: Tuple[int, int]) -> List[int]:
+        """The points in cell and the eight cells around it."""
+        return [i for radius in (0, 1) for i in self.ring(cell, radius)]
+
+    def remove(self, cell: Tuple[int, int], point: int) -> None:
+        points = self.cells[cell]
+        points.remove(point)
+        if not points:
+            del self.cells[cell]
+
+
+def unique_pixels(xy: np.ndarray) -> np.ndarray:
+    """The indices of the points of xy that do not repeat an earlier one, in
+    order. Points on a lattice are the same within its tolerance, other
+    points only when they are equal."""
+    xy = np.asarray(xy, dtype=float)[:, :2]
+    try:
+        cells = Lattice.infer(xy).encode(xy)
+    except ValueError:
+        return np.sort(np.unique(xy, axis=0, return_index=True)[1]) if len(xy) else np.arange(0)
+    return GridIndex(cells).first()
+
+
+def cell_size(xy: np.ndarray) -> float:
+    """A grid cell size giving about one of the points xy to a cell, for
+    points spread evenly over their bounding box."""
+    xy = np.asarray(xy, dtype=float)[:, :2]
+    if len(xy) < 2:
+        return 1.0
+    width, height = xy.max(axis=0) - xy.min(axis=0)
+    side = max(width, height)
+    if side == 0:
+        return 1.0
+    return max(math.sqrt(max(width, side / len(xy)) * max(height, side / len(xy)) / len(xy)), side * 1e-6)
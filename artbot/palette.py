@@ -0,0 +1,109 @@
+"""Which palette well each colour goes in.
+
+Every refill is a round trip between the palette and the canvases, so a
+colour that needs many refills should sit in a well close to the canvases.
+All trips go to about the same place, the centre of the pixels weighted by
+the refills that serve them, and the refill travel is then the sum over
+colours of refills times distance. By the rearrangement inequality that sum
+is smallest when the colours, most refills first, are paired with the
+wells, closest first: assign_wells.
+
+    python -m artbot.palette btwb-test-pattern-2 -c 5 [--palette-slot 11]
+
+prints the placement for a design without a robot or simulator, from the
+OT-2 deck slot positions and the labware registry (see artbot.labware).
+draw_art does the same with the loaded labware when optimise_palette is set.
+"""
+import argparse
+import math
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .art import load_art
+from .canvas import canvas_scale
+from .labware import default_registry
+from .planning import dispenses_per_refill
+
+# front left corner of each OT-2 deck slot, in deck coordinates
+SLOT_ORIGINS = {
+    '1': (0.0, 0.0, 0.0), '2': (132.5, 0.0, 0.0), '3': (265.0, 0.0, 0.0),
+    '4': (0.0, 90.5, 0.0), '5': (132.5, 90.5, 0.0), '6': (265.0, 90.5, 0.0),
+    '7': (0.0, 181.0, 0.0), '8': (132.5, 181.0, 0.0), '9': (265.0, 181.0, 0.0),
+    '10': (0.0, 271.5, 0.0), '11': (132.5, 271.5, 0.0), '12': (265.0, 271.5, 0.0),
+}
+
+
+def slot_origin(slot) -> np.ndarray:
+    return np.array(SLOT_ORIGINS[str(slot)])
+
+
+def refill_target(centroids: np.ndarray, refills: Sequence[int]) -> np.ndarray:
+    """The point every trip to the palette is taken to go to: the colours'
+    pixel centroids weighted by their refills."""
+    return np.average(np.asarray(centroids, dtype=float), axis=0, weights=np.asarray(refills, dtype=float))
+
+
+def assign_wells(refills: Sequence[int], distances: Sequence[float]) -> np.ndarray:
+    """The well index for each colour: the colours with most refills get the
+    closest wells. Ties keep the colour and plate order."""
+    refills = np.asarray(refills)
+    distances = np.asarray(distances, dtype=float)
+    if len(refills) > len(distances):
+        raise ValueError(f'{len(refills)} colours do not fit in a palette of {len(distances)} wells')
+    wells = np.empty(len(refills), dtype=np.intp)
+    wells[np.argsort(-refills, kind='stable')] = np.argsort(distances, kind='stable')[:len(refills)]
+    return wells
+
+
+def palette_travel(refills: Sequence[int], distances: Sequence[float], wells: Sequence[int]) -> float:
+    """Round trips from the wells to the refill target, in mm."""
+    return float(2 * np.dot(np.asarray(refills, dtype=float), np.asarray(distances, dtype=float)[np.asarray(wells)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('art', help='name or path of an art file')
+    parser.add_argument('-c', '--canvas', action='append', required=True,
+                        help='deck slot of a canvas, or title=slot, given once per art title')
+    parser.add_argument('--canvas-labware', default='bioartbot_petriplate_90mm_round')
+    parser.add_argument('--palette', default='cryo_35_tuberack_2000ul')
+    parser.add_argument('--palette-slot', default='11')
+    parser.add_argument('--vol', type=float, default=0.4, help='dispense volume in uL')
+    parser.add_argument('--max-volume', type=float, default=10, help='pipette volume in uL')
+    parser.add_argument('--disposal-vol', type=float, default=2)
+    args = parser.parse_args()
+
+    art = load_art(args.art)
+    titles = sorted({title for pixels in art.pixels_by_color_by_artpiece.values() for title in pixels})
+    slots: Dict[str, str] = {}
+    for i, canvas in enumerate(args.canvas):
+        title, _, slot = canvas.rpartition('=')
+        slots[title or titles[i]] = slot
+
+    registry = default_registry()
+    canvas = registry.geometry(args.canvas_labware)
+    palette = registry.geometry(args.palette)
+    per_refill = dispenses_per_refill(args.vol, args.max_volume, args.disposal_vol)
+    refills: List[int] = []
+    centroids = []
+    for color in art.colors:
+        points = [
+            canvas.centres[0] + np.asarray(pixels) * canvas_scale(canvas.half_sizes[0]) + slot_origin(slots[title])
+            for title, pixels in art.pixels_by_color_by_artpiece[color].items()
+        ]
+        points = np.concatenate(points)[:, :2]
+        refills.append(math.ceil(len(points) / per_refill))
+        centroids.append(points.mean(axis=0))
+    target = refill_target(centroids, refills)
+    well_points = palette.centres[:, :2] + slot_origin(args.palette_slot)[:2]
+    distances = np.linalg.norm(well_points - target, axis=1)
+    wells = assign_wells(refills, distances)
+    for color, well, count in zip(art.colors, wells, refills):
+        print(f'{art.color_map[color]} -> {palette.wells[well]} ({count} refills)')
+    before = palette_travel(refills, distances, np.arange(len(refills)))
+    print(f'palette trips: {before:.0f} mm in plate order -> {palette_travel(refills, distances, wells):.0f} mm')
+
+
+if __name__ == '__main__':
+    main()
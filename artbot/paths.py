@@ -0,0 +1,254 @@
+"""Travel-minimising visit order for the pixels of one colour.
+
+The gantry moves in straight lines, so the cost of a dispense order is the sum
+of the XY distances between consecutive pixels. A nearest neighbour tour gives
+a good starting order and 2-opt then removes the crossings it leaves behind.
+Both work on an (N, 2) NumPy array of XY coordinates, in whatever units the
+caller uses (deck millimetres or normalised canvas coordinates).
+
+A colour is dispensed a tipful at a time, with a trip back to the source well
+between refills. refill_order plans for that: it groups the pixels of every
+canvas on the deck into compact refills and orders each one as a round trip
+from the source.
+"""
+import math
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .lattice import GridIndex, cell_size, grid_cells
+
+
+@dataclass
+class PathPlan:
+    """A visit order and the travel it saves over the original order."""
+    order: np.ndarray
+    distance_before: float
+    distance_after: float
+
+
+def path_length(points: np.ndarray, order: Optional[np.ndarray] = None, start: Optional[Sequence[float]] = None,
+                end: Optional[Sequence[float]] = None) -> float:
+    """Total XY travel to visit points in order, optionally starting from
+    start and finishing at end."""
+    points = np.asarray(points, dtype=float)[:, :2]
+    if order is not None:
+        points = points[order]
+    if start is not None:
+        points = np.vstack([np.asarray(start, dtype=float)[:2], points])
+    if end is not None:
+        points = np.vstack([points, np.asarray(end, dtype=float)[:2]])
+    if len(points) < 2:
+        return 0.0
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+def _nearest(points: np.ndarray, index: GridIndex, size: float, current: np.ndarray) -> int:
+    """The closest point in index to current, the lowest index of a tie."""
+    cell = (math.floor(current[0] / size), math.floor(current[1] / size))
+    best, best_dist = -1, math.inf
+    radius = 0
+    searched = 0
+    while True:
+        if searched > len(index):
+            # far from every point left: cheaper to look at them all
+            candidates = [i for points in index.cells.values() for i in points]
+        else:
+            candidates = list(index.ring(cell, radius))
+        if candidates:
+            candidates = np.array(candidates, dtype=np.intp)
+            offsets = points[candidates] - current
+            dist = np.einsum('ij,ij->i', offsets, offsets)
+            k = int(np.lexsort((candidates, dist))[0])
+            if dist[k] < best_dist or (dist[k] == best_dist and candidates[k] < best):
+                best, best_dist = int(candidates[k]), float(dist[k])
+        # a point in a further ring is at least radius cells away
+        if best >= 0 and (searched > len(index) or (radius * size) ** 2 > best_dist):
+            return best
+        searched += max(1, 8 * radius)
+        radius += 1
+
+
+def nearest_neighbour_order(points: np.ndarray, start: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Greedy tour: always move to the closest pixel not yet visited.
+
+    The pixels are kept in a hash grid (see artbot.lattice) and each one is
+    found by searching rings of cells outwards from the last, so a tour takes
+    about linear time rather than comparing every pair of pixels.
+    """
+    points = np.asarray(points, dtype=float)[:, :2]
+    n = len(points)
+    order = np.empty(n, dtype=np.intp)
+    if n == 0:
+        return order
+    size = cell_size(points)
+    cells = grid_cells(points, size)
+    index = GridIndex(cells)
+    current = points[0] if start is None else np.asarray(start, dtype=float)[:2]
+    for step in range(n):
+        nearest = _nearest(points, index, size, current)
+        order[step] = nearest
+        index.remove(tuple(cells[nearest].tolist()), nearest)
+        current = points[nearest]
+    return order
+
+
+def _within(index: GridIndex, size: float, xy: Sequence[Tuple[float, float]], node: int, distance: float) -> Iterator[int]:
+    """The nodes in index closer to node than distance."""
+    point = xy[node]
+    cell = (math.floor(point[0] / size), math.floor(point[1] / size))
+    for radius in range(int(distance // size) + 2):
+        for other in index.ring(cell, radius):
+            if other != node and math.dist(point, xy[other]) < distance:
+                yield other
+
+
+def two_opt(points: np.ndarray, order: np.ndarray, start: Optional[Sequence[float]] = None, max_passes: int = 10,
+            end: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Improves an open path by reversing segments while that shortens it.
+
+    If start is given it is a fixed first point that is never moved,
+    otherwise the first pixel may change too. Likewise the path may end
+    anywhere unless a fixed last point, end, is given.
+
+    A reversal only shortens the path when one of the two edges it adds is
+    shorter than the edge it replaces at that end, so for every edge only
+    the pixels closer than its length to either of its ends are tried. They
+    come from a hash grid (see artbot.lattice), which makes a pass about
+    linear in the number of pixels.
+    """
+    points = np.asarray(points, dtype=float)[:, :2]
+    path = points[order]
+    order = np.array(order, dtype=np.intp)
+    fixed_start = start is not None
+    fixed_end = end is not None
+    if fixed_start:
+        path = np.vstack([np.asarray(start, dtype=float)[:2], path])
+        order = np.concatenate([[-1], order])
+    if fixed_end:
+        path = np.vstack([path, np.asarray(end, dtype=float)[:2]])
+        order = np.concatenate([order, [-1]])
+    n = len(path)
+    if n < 3:
+        return order[int(fixed_start):n - int(fixed_end)]
+
+    # nodes are the points of the path as given, and node_at and position
+    # map between nodes and where they are in the path now
+    xy = [tuple(point) for point in path.tolist()]
+    node_at = np.arange(n)
+    position = np.arange(n)
+    size = cell_size(path)
+    index = GridIndex(grid_cells(path, size))
+    first = int(fixed_start)
+    last = n - 1 - int(fixed_end)
+
+    def length(i: int, j: int) -> float:
+        return math.dist(xy[node_at[i]], xy[node_at[j]])
+
+    def gain(i: int, j: int) -> float:
+        """How much reversing path[i:j + 1] shortens it."""
+        if i < first or j > last or j <= i:
+            return 0.0
+        saved = 0.0
+        if i > 0:
+            saved += length(i - 1, i) - length(i - 1, j)
+        if j < n - 1:
+            saved += length(j, j + 1) - length(i, j + 1)
+        return saved
+
+    for _ in range(max_passes):
+        improved = False
+        for p in range(n - 1):
+            # the edge from p to p + 1 and the reversals adding a shorter
+            # edge at p, or at p + 1
+            edge = length(p, p + 1)
+            moves = []
+            for other in _within(index, size, xy, int(node_at[p]), edge):
+                q = int(position[other])
+                moves.append((p + 1, q) if q > p else (q + 1, p))
+            for other in _within(index, size, xy, int(node_at[p + 1]), edge):
+                q = int(position[other])
+                moves.append((p + 1, q - 1) if q > p + 1 else (q, p))
+            if not moves:
+                continue
+            best_gain, i, j = max((gain(i, j), i, j) for i, j in moves)
+            if best_gain > 1e-9:
+                node_at[i:j + 1] = node_at[i:j + 1][::-1]
+                position[node_at[i:j + 1]] = np.arange(i, j + 1)
+                improved = True
+        if not improved:
+            break
+    return order[node_at][first:last + 1]
+
+
+def optimise_order(points: np.ndarray, start: Optional[Sequence[float]] = None, max_passes: int = 10) -> PathPlan:
+    """Nearest neighbour followed by 2-opt, with the travel before and after."""
+    points = np.asarray(points, dtype=float)
+    order = nearest_neighbour_order(points, start)
+    order = two_opt(points, order, start, max_passes)
+    return PathPlan(
+        order=order,
+        distance_before=path_length(points, start=start),
+        distance_after=path_length(points, order, start),
+    )
+
+
+def refill_length(points: np.ndarray, per_refill: int, order: Optional[np.ndarray] = None,
+                  source: Optional[Sequence[float]] = None, end: Optional[Sequence[float]] = None) -> float:
+    """Total XY travel when points are dispensed in order, per_refill at a
+    time, with a round trip from source for every refill. With end the last
+    refill goes there rather than back to source."""
+    points = np.asarray(points, dtype=float)
+    if order is not None:
+        points = points[order]
+    return sum(
+        path_length(points[i:i + per_refill], start=source,
+                    end=end if end is not None and i + per_refill >= len(points) else source)
+        for i in range(0, len(points), per_refill)
+    )
+
+
+def refill_order(points: np.ndarray, per_refill: int, source: Optional[Sequence[float]] = None,
+                 max_passes: int = 10) -> PathPlan:
+    """Order for dispensing points in refills of per_refill from source.
+
+    One tour through every point, across all canvases, is cut into runs of
+    per_refill, so each refill serves a compact group of pixels wherever
+    they are on the deck. Each run is then ordered as a round trip from the
+    source and back. Distances count the trips to the source.
+    """
+    points = np.asarray(points, dtype=float)
+    order = optimise_order(points, source, max_passes).order
+    for i in range(0, len(order), per_refill):
+        run = order[i:i + per_refill]
+        sub = nearest_neighbour_order(points[run], source)
+        order[i:i + per_refill] = run[two_opt(points[run], sub, source, max_passes, end=source)]
+    return PathPlan(
+        order=order,
+        distance_before=refill_length(points, per_refill, source=source),
+        distance_after=refill_length(points, per_refill, order, source),
+    )
+
+
+def optimise_locations(locations: Sequence, start=None, max_passes: int = 10,
+                       per_refill: Optional[int] = None) -> Tuple[Sequence, PathPlan]:
+    """Reorders a list of opentrons Locations, or a CanvasLocations sequence.
+    start may be a Location or Well, e.g. the palette well the pipette
+    aspirates from before the first pixel. With per_refill the pixels are
+    ordered for refills of that many dispenses from start, see refill_order."""
+    if hasattr(locations, 'reordered'):
+        points = locations.points[:, :2]
+    else:
+        points = np.array([[loc.point.x, loc.point.y] for loc in locations], dtype=float).reshape(-1, 2)
+    start_point = None
+    if start is not None:
+        point = start.point if hasattr(start, 'point') else start.top().point
+        start_point = (point.x, point.y)
+    if per_refill:
+        plan = refill_order(points, per_refill, start_point, max_passes)
+    else:
+        plan = optimise_order(points, start_point, max_passes)
+    if hasattr(locations, 'reordered'):
+        return locations.reordered(plan.order), plan
+    return [locations[i] for i in plan.order], plan
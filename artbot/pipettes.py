@@ -0,0 +1,135 @@
+"""Using an 8 channel p10 as a single channel pipette, or with a few of its
+channels to draw replicate plates."""
+import math
+from typing import List, Optional, Union
+
+from opentrons import protocol_api
+from opentrons.types import Location
+from opentrons.protocol_api.instrument_context import InstrumentContext
+from opentrons.protocol_api import labware
+from opentrons.protocol_api.labware import OutOfTipsError
+
+from .instrumentation import PipetteInstrumentation
+from .planning import plan_distribution
+from .policy import TipPolicy
+from .tips import ReverseTipPickUpDirection, TipScheduler
+
+
+class EightToSingleChannelPipette(InstrumentContext):
+    def __init__(self, protocol : protocol_api.ProtocolContext, instrument_context: InstrumentContext) -> None:
+        super().__init__(core=instrument_context._core, 
+                         protocol_core = instrument_context._protocol_core,
+                         broker=instrument_context._broker, 
+                         api_version=instrument_context._api_version, 
+                         tip_racks=instrument_context.tip_racks, 
+                         trash=instrument_context.trash_container,
+                         requested_as= instrument_context.requested_as)
+        for i, tip_rack in enumerate(self.tip_racks):
+            self.tip_racks[i] = ReverseTipPickUpDirection(tip_rack)
+        self.tip_scheduler = TipScheduler(self.tip_racks)
+
+    @property  # type: ignore
+    def channels(self) -> int:
+        """The number of channels on the pipette."""
+        return 1
+
+    def pick_up_tip(self, location: Optional[Union[Location, labware.Well]] = None, presses: Optional[int] = None, increment: Optional[float] = None, prep_after: Optional[bool] = None) -> InstrumentContext:
+        """Defaults presses to 1, as that tends to work best for the 8-1 channel"""
+        if not presses:
+            presses = 1
+        if location is None and self.starting_tip is None:
+            next_tip = self.tip_scheduler.next_tip()
+            if next_tip is None:
+                raise OutOfTipsError
+            location = next_tip[1]
+        return super().pick_up_tip(location, presses, increment, prep_after)
+
+    def instrument(self, instrumentation: PipetteInstrumentation) -> None:
+        """Times this pipette's aspirate, dispense, move_to, touch_tip,
+        pick_up_tip and drop_tip calls, see artbot.instrumentation."""
+        instrumentation.attach(self)
+
+    def reset_tipracks(self) -> None:
+        super().reset_tipracks()
+        self.tip_scheduler.reset()
+
+    def racks_needed(self, dispense_counts: List[int], vol: float, disposal_vol: float, policy: Optional[TipPolicy] = None) -> int:
+        """The number of tip racks, counting from the rack in use, needed to run
+        distribute_to_agar once for each entry of dispense_counts."""
+        num_tips = sum(
+            plan_distribution(num_dispenses, vol, self.max_volume, disposal_vol, policy).num_tips
+            for num_dispenses in dispense_counts
+        )
+        return self.tip_scheduler.racks_needed(num_tips)
+
+
+class ReplicatePipette(EightToSingleChannelPipette):
+    """Uses the back num_tips nozzles of an 8 channel p10 to draw the same
+    pixel on num_tips canvases at once.
+
+    The canvases have to sit under the nozzles, 9 mm apart front to back,
+    like the lanes of the bioartbot_replicate_tray_8_lanes labware, and the
+    colours have to come from a reservoir every nozzle can reach. Locations
+    are given for the back nozzle, so the canvas in the back lane.
+    """
+    def __init__(self, protocol : protocol_api.ProtocolContext, instrument_context: InstrumentContext, num_tips: int) -> None:
+        if not 1 <= num_tips <= 8:
+            raise ValueError(f'num_tips must be between 1 and 8, got {num_tips}')
+        super().__init__(protocol, instrument_context)
+        self.num_tips = num_tips
+
+    @property  # type: ignore
+    def channels(self) -> int:
+        """The number of channels with a tip."""
+        return self.num_tips
+
+    def pick_up_tip(self, location: Optional[Union[Location, labware.Well]] = None, presses: Optional[int] = None, increment: Optional[float] = None, prep_after: Optional[bool] = None) -> InstrumentContext:
+        """Picks up num_tips tips with the back nozzles, the lowest left in a column."""
+        if location is None and self.starting_tip is None:
+            next_tip = self.tip_scheduler.next_tip(self.num_tips)
+            if next_tip is None:
+                raise OutOfTipsError
+            location = next_tip[1]
+        return super().pick_up_tip(location, presses, increment, prep_after)
+
+    def racks_needed(self, dispense_counts: List[int], vol: float, disposal_vol: float, policy: Optional[TipPolicy] = None) -> int:
+        """The number of full tip racks needed to run distribute_to_agar once
+        for each entry of dispense_counts. A column serves 8 // num_tips pick ups."""
+        pick_ups = sum(
+            plan_distribution(num_dispenses, vol, self.max_volume, disposal_vol, policy).num_tips
+            for num_dispenses in dispense_counts
+        )
+        tip_rack = self.tip_racks[0]
+        pick_ups_per_rack = len(tip_rack.columns()) * (len(tip_rack.columns()[0]) // self.num_tips)
+        return math.ceil(pick_ups / pick_ups_per_rack)
+
+
+def get_pipette(protocol : protocol_api.ProtocolContext, name: str, mount:str, tip_racks: List[labware.Labware], replicates: int = 1) -> InstrumentContext:
+    """Loads a pipette; a p10_multi is wrapped to use one nozzle or, with
+    replicates above 1, that many nozzles."""
+    if name == "p10_multi" and replicates > 1:
+        return ReplicatePipette(
+            protocol,
+            protocol.load_instrument(
+                name,
+                mount=mount,
+                tip_racks= tip_racks
+            ),
+            replicates
+        )
+    if replicates > 1:
+        raise ValueError(f'replicates need a p10_multi, not a {name}')
+    if name == "p10_multi":
+        return EightToSingleChannelPipette(
+            protocol,
+            protocol.load_instrument(
+                name,
+                mount=mount,
+                tip_racks= tip_racks
+            )
+        )
+    return protocol.load_instrument(
+            name,
+            mount=mount,
+            tip_racks= tip_racks
+    )
@@ -0,0 +1,113 @@
+"""On-disk cache of the plan for each colour of a design.
+
+Planning a colour, converting its pixels to deck points, ordering them for
+refills and planning the refills and tip changes, only depends on the points
+and a handful of settings. The cache files each colour's pixel order and
+DistributionPlan under a SHA-256 of exactly those, so after a few pixels of
+a design are changed only the colours they belong to are planned again.
+
+    cache = PlanCache('/data/user_storage/artbot-plans')
+    key = cache.key(points, source=(152.6, 343.4), per_refill=19, ...)
+    entry = cache.get(key)   # None on a miss
+    cache.put(key, entry)
+
+Every entry is a small JSON file. Reading an entry marks it as used, and
+when there are more than max_entries files the least recently used are
+deleted. draw_art does this when given a ``plan_cache`` directory.
+"""
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+from .planning import DistributionPlan, Refill
+from .policy import TipUsage
+
+# part of every key, so a change to the planners or this format is a miss
+CACHE_VERSION = 3
+
+_SUFFIX = '.json'
+
+
+@dataclass
+class CachedPlan:
+    """A colour's pixel order, None when the pixels were not reordered, the
+    travel before and after reordering, and its plan of refills."""
+    order: Optional[np.ndarray]
+    distance_before: float
+    distance_after: float
+    plan: DistributionPlan
+
+
+def _to_json(entry: CachedPlan) -> dict:
+    return {
+        'order': entry.order.tolist() if entry.order is not None else None,
+        'distance_before': entry.distance_before,
+        'distance_after': entry.distance_after,
+        'plan': asdict(entry.plan),
+    }
+
+
+def _from_json(data: dict) -> CachedPlan:
+    plan = dict(data['plan'])
+    plan['refills'] = [Refill(**refill) for refill in plan['refills']]
+    plan['tips'] = [TipUsage(**tip) for tip in plan['tips']]
+    order = data['order']
+    return CachedPlan(
+        np.asarray(order, dtype=np.intp) if order is not None else None,
+        data['distance_before'], data['distance_after'], DistributionPlan(**plan),
+    )
+
+
+class PlanCache:
+    def __init__(self, directory: str, max_entries: int = 256) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(points: np.ndarray, **settings) -> str:
+        """A hash of the points of a colour, in order, and the settings that
+        plan them. settings has to be JSON serialisable."""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(points, dtype='<f8').tobytes())
+        digest.update(json.dumps([CACHE_VERSION, settings], sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[CachedPlan]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = _from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing, or left half written by a run that was stopped
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedPlan) -> None:
+        # written under a temporary name so a reader never sees half a file
+        path = self._path(key)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(_to_json(entry), f)
+        os.replace(path + '.tmp', path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Deletes the least recently used entries over max_entries."""
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(_SUFFIX)]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            os.remove(entry.path)
@@ -0,0 +1,127 @@
+"""Aspirate and dispense schedules for distribute_to_agar.
+
+A colour is dispensed in refills: the pipette aspirates enough for as many
+dispenses as fit next to the disposal volume, dispenses them one pixel at a
+time, then goes back to the source. The tip is changed at the first refill
+and whenever the tip policy says it has done enough, see artbot.policy.
+Planning this up front leaves no arithmetic in the dispense loop and lets a
+protocol report or compare source round trips and tips before anything moves.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .policy import TipPolicy, TipUsage, TravelLegs
+
+
+@dataclass
+class Refill:
+    """One trip to the source and the dispenses it serves, destination[start:stop].
+
+    fill_volume is what the tip holds after aspirating: the dispenses plus
+    the disposal volume. aspirate_volume is the planned top up, which is the
+    whole fill for a new tip and the dispenses alone otherwise.
+    """
+    start: int
+    stop: int
+    aspirate_volume: float
+    fill_volume: float
+    new_tip: bool
+
+    @property
+    def num_dispenses(self) -> int:
+        return self.stop - self.start
+
+
+@dataclass
+class DistributionPlan:
+    vol: float
+    disposal_vol: float
+    num_dispenses: int
+    refills: List[Refill]
+    tips: List[TipUsage] = field(default_factory=list)
+
+    @property
+    def num_refills(self) -> int:
+        return len(self.refills)
+
+    @property
+    def num_tips(self) -> int:
+        return sum(refill.new_tip for refill in self.refills)
+
+    @property
+    def total_aspirated(self) -> float:
+        return sum(refill.aspirate_volume for refill in self.refills)
+
+    def describe(self) -> str:
+        return f'{self.num_dispenses} dispenses, {self.num_refills} refills, {self.num_tips} tips'
+
+
+def dispenses_per_refill(vol: float, max_volume: float, disposal_vol: float) -> int:
+    """How many dispenses of vol fit in the tip next to the disposal volume."""
+    # the small tolerance keeps e.g. 8 / 0.4 from flooring to 19
+    per_refill = math.floor((max_volume - disposal_vol) / vol + 1e-9)
+    if per_refill < 1:
+        raise ValueError(f'a {vol} uL dispense and {disposal_vol} uL disposal volume do not fit in {max_volume} uL')
+    return per_refill
+
+
+def plan_distribution(num_dispenses: int, vol: float, max_volume: float, disposal_vol: float,
+                      policy: Optional[TipPolicy] = None, colour: Optional[str] = None,
+                      points: Optional[np.ndarray] = None, source: Optional[Sequence[float]] = None) -> DistributionPlan:
+    """The refills needed to make num_dispenses dispenses of vol.
+
+    Follows the ARTBot template: each refill tops the tip up to its dispenses
+    plus the disposal volume, the disposal volume stays in the tip between
+    refills, and a new tip starts empty. Tips are changed as the policy's
+    limits for colour require, see artbot.policy; the default policy gives
+    the template's tip changes. Travel limits need the points of the
+    dispenses, in order, and the source's position.
+    """
+    policy = policy or TipPolicy()
+    limits = policy.limits(colour)
+    if limits.max_travel_mm is not None and points is None:
+        raise ValueError('a tip travel limit needs the points of the dispenses')
+    legs = TravelLegs(points, source)
+    per_refill = dispenses_per_refill(vol, max_volume, disposal_vol)
+
+    def usage_after(usage: TipUsage, start: int, count: int) -> TipUsage:
+        travel = legs.refill(start, start + count)
+        if usage.refills:
+            # back to the source from the last pixel of the previous refill
+            travel += legs.back(start - 1)
+        return TipUsage(usage.dispenses + count, usage.refills + 1, usage.travel_mm + travel)
+
+    def dispenses_that_fit(usage: TipUsage, start: int, stop: int) -> int:
+        count = 0
+        while count < stop - start and policy.within(limits, usage_after(usage, start, count + 1)):
+            count += 1
+        return count
+
+    refills: List[Refill] = []
+    tips: List[TipUsage] = []
+    start = 0
+    while start < num_dispenses:
+        stop = min(start + per_refill, num_dispenses)
+        new_tip = not tips
+        if not new_tip and not policy.hard_limits:
+            new_tip = policy.due(limits, tips[-1], refills[-1].start, start)
+        elif not new_tip:
+            fit = dispenses_that_fit(tips[-1], start, stop)
+            if fit == 0 or (fit < stop - start and not policy.split_refills):
+                new_tip = True
+            else:
+                stop = start + fit
+        if new_tip:
+            tips.append(TipUsage())
+            if policy.hard_limits:
+                # a fresh tip always makes at least one dispense
+                stop = start + max(dispenses_that_fit(tips[-1], start, stop), 1)
+        tips[-1] = usage_after(tips[-1], start, stop - start)
+        fill_volume = (stop - start) * vol + disposal_vol
+        aspirate_volume = fill_volume if new_tip else fill_volume - disposal_vol
+        refills.append(Refill(start, stop, aspirate_volume, fill_volume, new_tip))
+        start = stop
+    return DistributionPlan(vol, disposal_vol, num_dispenses, refills, tips)
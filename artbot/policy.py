@@ -0,0 +1,104 @@
+"""When a tip has to be changed while dispensing one colour.
+
+The ARTBot template changed tips every 150 dispenses. A TipPolicy instead
+sets limits on how much one tip may do: dispenses, estimated time in use and
+gantry travel, with different limits for colours that need them. A tip is
+always changed between colours.
+
+By default the limits are checked where the template checked them, at the
+start of each refill: the tip is changed there once it is due, and a refill
+that crosses a limit is finished with the same tip. Dispenses count as in the
+template, a tip every max_dispenses dispenses of the colour, so the default
+policy plans the template's tips and refills. With hard_limits no tip goes
+past a limit: plan_distribution keeps each tip in use until the next dispense
+would break one, and with split_refills a refill is cut short to use up the
+tip rather than changing it early.
+
+    policy = TipPolicy(TipLimits(max_dispenses=300, max_seconds=600),
+                       by_colour={'blue': TipLimits(max_dispenses=100)})
+
+Time in use is estimated from the dispenses, refills and travel of the tip
+with the rates in the policy, as the plan is made before anything moves.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class TipLimits:
+    """The most one tip may do; None is no limit. How strictly the limits
+    hold is up to the TipPolicy, see hard_limits."""
+    max_dispenses: Optional[int] = 150
+    max_seconds: Optional[float] = None
+    max_travel_mm: Optional[float] = None
+
+
+@dataclass
+class TipUsage:
+    """What one tip did, or will have done, in a plan."""
+    dispenses: int = 0
+    refills: int = 0
+    travel_mm: float = 0.0
+
+
+@dataclass
+class TipPolicy:
+    default: TipLimits = field(default_factory=TipLimits)
+    by_colour: Dict[str, TipLimits] = field(default_factory=dict)
+    hard_limits: bool = False
+    split_refills: bool = True
+    # rates for estimating how long a tip has been in use
+    seconds_per_dispense: float = 1.0
+    seconds_per_refill: float = 3.0
+    travel_speed: float = 100.0
+
+    def limits(self, colour: Optional[str] = None) -> TipLimits:
+        return self.by_colour.get(colour, self.default) if colour is not None else self.default
+
+    def seconds(self, usage: TipUsage) -> float:
+        return (usage.dispenses * self.seconds_per_dispense + usage.refills * self.seconds_per_refill
+                + usage.travel_mm / self.travel_speed)
+
+    def due(self, limits: TipLimits, usage: TipUsage, previous: int, start: int) -> bool:
+        """Whether a tip that has done usage is changed before the refill
+        starting at dispense start, the refill before it starting at
+        previous: once it has reached a time or travel limit, or, as in the
+        template, when a multiple of max_dispenses dispenses of the colour
+        has come up since previous."""
+        return (
+            (limits.max_dispenses is not None
+             and (start + 1) // limits.max_dispenses > (previous + 1) // limits.max_dispenses)
+            or (limits.max_travel_mm is not None and usage.travel_mm >= limits.max_travel_mm)
+            or (limits.max_seconds is not None and self.seconds(usage) >= limits.max_seconds)
+        )
+
+    def within(self, limits: TipLimits, usage: TipUsage) -> bool:
+        return (
+            (limits.max_dispenses is None or usage.dispenses <= limits.max_dispenses)
+            and (limits.max_travel_mm is None or usage.travel_mm <= limits.max_travel_mm)
+            and (limits.max_seconds is None or self.seconds(usage) <= limits.max_seconds)
+        )
+
+
+class TravelLegs:
+    """XY distances for a colour's dispenses in order: from the source to
+    each pixel, from each pixel to the next and from each pixel back."""
+    def __init__(self, points: Optional[np.ndarray], source: Optional[Sequence[float]]) -> None:
+        self.known = points is not None
+        if not self.known:
+            return
+        points = np.asarray(points, dtype=float)[:, :2]
+        source = np.zeros(2) if source is None else np.asarray(source, dtype=float)[:2]
+        self.from_source = np.linalg.norm(points - source, axis=1)
+        self.step = np.concatenate([[0.0], np.linalg.norm(np.diff(points, axis=0), axis=1)])
+
+    def refill(self, start: int, stop: int) -> float:
+        """Travel from the source through destination[start:stop]."""
+        if not self.known or stop <= start:
+            return 0.0
+        return float(self.from_source[start] + self.step[start + 1:stop].sum())
+
+    def back(self, index: int) -> float:
+        return float(self.from_source[index]) if self.known else 0.0
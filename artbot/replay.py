@@ -0,0 +1,79 @@
+"""Runs a program compiled by artbot.compiler.
+
+A program is JSON: the labware to load by deck slot, the pipettes by mount
+and a flat list of commands with every coordinate worked out in advance.
+
+    {"labware": {"10": "opentrons_96_tiprack_20ul", ...},
+     "pipettes": {"right": {"name": "p10_multi", "tip_racks": ["10"], "replicates": 1}},
+     "commands": [["pick_up_tip", "right", "10", "H12"],
+                  ["aspirate", "right", 10.0, 1.0, [152.65, 343.38, 2.8, "11", "A1"]],
+                  ["touch_tip", "right", -15],
+                  ["dispense", "right", 0.4, 1.0, [172.621, 143.422, 17.639, "5", null]],
+                  ["stroke", "right", 1.6, 1.0, [179.409, 143.422, 17.639, "5", "A1"]], ...]}
+
+A point is [x, y, z, slot, well], with a null well for a point on the
+labware itself, and a null point for aspirating or dispensing where the
+pipette already is. A stroke dispenses while moving in a straight line from
+where the pipette is to its point, see artbot.strokes. The robot only loads
+the deck and walks the list: no design is read and no plan is made during
+the run.
+"""
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from opentrons import protocol_api
+from opentrons.types import Location, Point
+
+from .labware import load_labware
+from .pipettes import get_pipette
+from .strokes import stroke
+
+PROGRAM_DIR = os.path.join(os.path.dirname(__file__), 'programs')
+PROGRAM_SUFFIX = '.json'
+
+
+def load_program(name_or_path: str) -> dict:
+    """A program from a file, or by name from artbot/programs."""
+    path = name_or_path
+    if not os.path.exists(path):
+        path = os.path.join(PROGRAM_DIR, name_or_path + PROGRAM_SUFFIX)
+    with open(path) as f:
+        return json.load(f)
+
+
+def replay(protocol: protocol_api.ProtocolContext, program: dict) -> None:
+    """Loads the deck of program and runs its commands in order."""
+    labware = {slot: load_labware(protocol, load_name, slot) for slot, load_name in program['labware'].items()}
+    pipettes = {
+        mount: get_pipette(protocol, spec['name'], mount, tip_racks=[labware[slot] for slot in spec['tip_racks']],
+                           replicates=spec.get('replicates', 1))
+        for mount, spec in program['pipettes'].items()
+    }
+
+    # each well or labware is looked up once, however many points are on it
+    targets: Dict[tuple, object] = {}
+
+    def location(point) -> Optional[Location]:
+        if point is None:
+            return None
+        x, y, z, slot, well = point
+        if (slot, well) not in targets:
+            targets[slot, well] = labware[slot] if well is None else labware[slot][well]
+        return Location(Point(x, y, z), targets[slot, well])
+
+    def pick_up_tip(mount, slot, well):
+        pipettes[mount].pick_up_tip(labware[slot][well])
+
+    commands: Dict[str, Callable] = {
+        'comment': protocol.comment,
+        'pick_up_tip': pick_up_tip,
+        'drop_tip': lambda mount: pipettes[mount].drop_tip(),
+        'aspirate': lambda mount, volume, rate, point: pipettes[mount].aspirate(volume, location(point), rate),
+        'dispense': lambda mount, volume, rate, point: pipettes[mount].dispense(volume, location(point), rate),
+        'stroke': lambda mount, volume, rate, point: stroke(pipettes[mount], volume, location(point), rate),
+        'move_to': lambda mount, point: pipettes[mount].move_to(location(point)),
+        'touch_tip': lambda mount, v_offset: pipettes[mount].touch_tip(v_offset=v_offset),
+    }
+    for name, *args in program['commands']:
+        commands[name](*args)
@@ -0,0 +1,303 @@
+"""The body shared by every ARTBot protocol: load the deck, then dispense each
+colour of a design onto its canvases."""
+import math
+from dataclasses import asdict
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from opentrons import protocol_api
+
+from .art import ArtPiece
+from .canvas import CanvasLocations
+from .distribute import distribute_to_agar
+from .instrumentation import PipetteInstrumentation
+from .labware import load_labware
+from .palette import assign_wells, refill_target
+from .paths import refill_length, refill_order
+from .pipettes import get_pipette
+from .plancache import CachedPlan, PlanCache
+from .planning import DistributionPlan, dispenses_per_refill, plan_distribution
+from .policy import TipPolicy
+from .sequence import end_near, order_colours, tip_points, trash_point
+from .strokes import check_strokes
+from .validate import validate_art, well_shape
+
+TIP_RACK = 'opentrons_96_tiprack_20ul'
+PALETTE = 'cryo_35_tuberack_2000ul'
+CANVAS = 'bioartbot_petriplate_90mm_round'
+
+# replicate runs draw on the lanes of a tray with several nozzles at once,
+# from a reservoir every nozzle can reach
+REPLICATE_PALETTE = 'nest_12_reservoir_15ml'
+REPLICATE_CANVAS = 'bioartbot_replicate_tray_8_lanes'
+
+
+def load_palette_colors(protocol: protocol_api.ProtocolContext, palette, art: ArtPiece,
+                        pixels_by_color: Optional[Dict[str, CanvasLocations]] = None,
+                        per_refill: Optional[int] = None) -> Dict[str, object]:
+    """Gives each colour the next well of the palette, in plate order, and
+    tells the operator where to load them.
+
+    With the pixels of each colour and the dispenses per refill of the
+    pipette, the colours that need the most refills go in the wells closest
+    to the canvases instead, see artbot.palette. When no colour has pixels
+    the wells stay in plate order.
+    """
+    drawn = [color for color in art.colors if len(pixels_by_color[color])] if pixels_by_color is not None else []
+    if drawn:
+        refills = [math.ceil(len(pixels_by_color[color]) / per_refill) for color in drawn]
+        target = refill_target([pixels_by_color[color].points[:, :2].mean(axis=0) for color in drawn], refills)
+        wells = palette.wells()
+        points = np.array([[well.top().point.x, well.top().point.y] for well in wells])
+        # colours without pixels take the remaining wells
+        order = drawn + [color for color in art.colors if color not in drawn]
+        assigned = assign_wells(refills + [0] * (len(order) - len(drawn)), np.linalg.norm(points - target, axis=1))
+        palette_colors = {color: wells[i] for color, i in zip(order, assigned)}
+        palette_colors = {color: palette_colors[color] for color in art.colors}
+    else:
+        # a function that gets us the next available well in a plate
+        def well_generator(plate):
+            for well in plate.wells():
+                yield well
+        get_well = well_generator(palette)
+
+        # colored culture locations
+        palette_colors = { color: next(get_well) for color in art.colors }
+    protocol.comment('**CHECK BEFORE RUNNING** - Colors should be loaded into these wells:')
+    for color in palette_colors:
+        protocol.comment(f'{art.color_map[color]} -> {palette_colors[color]}')
+    return palette_colors
+
+
+def load_canvases(protocol: protocol_api.ProtocolContext, canvas_locations: Dict[str, Union[str, List[str]]], canvas: str = CANVAS) -> Dict[str, List[object]]:
+    """Loads the canvas plates for each art title. A title mapped to a list
+    of deck slots is drawn on a plate in each of them."""
+    canvas_labware = dict()
+    for art_title, slots in canvas_locations.items():
+        if isinstance(slots, (str, int)):
+            slots = [slots]
+        canvas_labware[art_title] = [load_labware(protocol, canvas, slot) for slot in slots]
+    return canvas_labware
+
+
+def check_art(protocol: protocol_api.ProtocolContext, art: ArtPiece, canvas_labware: Dict[str, List[object]],
+              dispense_amount: float) -> None:
+    """Checks art on the loaded canvases, see artbot.validate. Warnings go to
+    the run log; errors raise ValueError before anything moves."""
+    plates = [plate for plates in canvas_labware.values() for plate in plates]
+    if not plates:
+        return
+    half_size, circular = well_shape(plates[0].wells()[0])
+    report = validate_art(art, dispense_amount, half_size, circular)
+    if not report.ok:
+        raise ValueError(f'the design cannot be drawn: {report.describe()}')
+    for finding in report.findings:
+        protocol.comment(f'Design {finding.describe()}')
+
+
+def canvas_names(canvas_labware: Dict[str, List[object]]) -> Dict[object, str]:
+    """The name each canvas plate is reported as: its art title, followed by
+    its deck slot when the title is drawn more than once."""
+    names = dict()
+    for art_title, plates in canvas_labware.items():
+        for plate in plates:
+            names[plate] = art_title if len(plates) == 1 else f'{art_title} ({plate.parent})'
+    return names
+
+
+def pixel_locations(art: ArtPiece, canvas_labware: Dict[str, List[object]]) -> Dict[str, CanvasLocations]:
+    """The locations to dispense each colour to, across all canvases."""
+    pixels_by_color = dict()
+    for color, pixels_by_artpiece in art.pixels_by_color_by_artpiece.items():
+        pixels_by_color[color] = CanvasLocations.concatenate([
+            CanvasLocations.from_pixels(plate, pixels_by_artpiece[art_title])
+            for art_title in pixels_by_artpiece
+            for plate in canvas_labware[art_title]
+        ])
+    return pixels_by_color
+
+
+def plan_colours(
+    protocol: protocol_api.ProtocolContext,
+    art: ArtPiece,
+    pixels_by_color: Dict[str, CanvasLocations],
+    palette_colors: Dict[str, object],
+    pipette,
+    dispense_amount: float,
+    disposal_vol: float,
+    optimise_path: bool = False,
+    tip_policy: Optional[TipPolicy] = None,
+    cache: Optional[PlanCache] = None,
+    finish: Optional[Sequence[float]] = None,
+) -> Dict[str, DistributionPlan]:
+    """Every colour's refills and tip changes with pipette, worked out
+    before anything moves. With optimise_path the pixels of each
+    colour are reordered in place first. With finish, the XY the pipette
+    goes to after a colour, its last refill is reordered to end near there,
+    see artbot.sequence.end_near. With a cache, colours planned before with
+    the same pixels and settings are not planned again."""
+    plans = dict()
+    for color in pixels_by_color:
+        source = palette_colors[color].top().point
+        per_refill = dispenses_per_refill(dispense_amount, pipette.max_volume, disposal_vol)
+        key = entry = None
+
+        def plan_for(points: np.ndarray) -> DistributionPlan:
+            return plan_distribution(
+                len(points), dispense_amount, pipette.max_volume, disposal_vol, policy=tip_policy,
+                colour=art.color_map[color], points=points, source=(source.x, source.y),
+            )
+
+        if cache is not None:
+            key = cache.key(
+                pixels_by_color[color].points, colour=art.color_map[color], source=(source.x, source.y),
+                per_refill=per_refill, vol=dispense_amount, max_volume=pipette.max_volume, disposal_vol=disposal_vol,
+                optimise_path=optimise_path, tip_policy=asdict(tip_policy) if tip_policy else None,
+                finish=[float(x) for x in finish[:2]] if finish is not None else None,
+            )
+            entry = cache.get(key)
+        if entry is None:
+            order, distance_before, distance_after = None, 0.0, 0.0
+            points = pixels_by_color[color].points
+            if optimise_path:
+                path_plan = refill_order(points[:, :2], per_refill, (source.x, source.y))
+                order, distance_before, distance_after = path_plan.order, path_plan.distance_before, path_plan.distance_after
+                points = points[order]
+            plan = plan_for(points)
+            if finish is not None and plan.refills:
+                finished = end_near(points, plan.refills[-1].start, (source.x, source.y), finish)
+                if finished is not None:
+                    replanned = plan_for(points[finished])
+                    # only when the tip policy still splits the refills the same way
+                    if [(r.start, r.stop, r.new_tip) for r in replanned.refills] == [(r.start, r.stop, r.new_tip) for r in plan.refills]:
+                        order = finished if order is None else order[finished]
+                        points = points[finished]
+                        plan = replanned
+                # the travel to finish rather than back from the last pixel
+                distance_before = refill_length(pixels_by_color[color].points, per_refill, source=(source.x, source.y), end=finish)
+                distance_after = refill_length(points, per_refill, source=(source.x, source.y), end=finish)
+            if order is not None and distance_after >= distance_before:
+                # no shorter, e.g. it only paid off with a trip back to the palette
+                order, distance_after = None, distance_before
+                plan = plan_for(pixels_by_color[color].points)
+            entry = CachedPlan(order, distance_before, distance_after, plan)
+            if cache is not None:
+                cache.put(key, entry)
+        if entry.order is not None:
+            pixels_by_color[color] = pixels_by_color[color].reordered(entry.order)
+            protocol.comment(f'{art.color_map[color]} travel: {entry.distance_before:.0f} mm -> {entry.distance_after:.0f} mm')
+        plans[color] = entry.plan
+        protocol.comment(f'{art.color_map[color]}: {plans[color].describe()}')
+    protocol.comment(f'Tips: {sum(plan.num_tips for plan in plans.values())} for the whole run')
+    if cache is not None:
+        protocol.comment(f'Plans: {cache.hits} of {cache.hits + cache.misses} colours from the cache')
+    return plans
+
+
+def colour_order(protocol: protocol_api.ProtocolContext, art: ArtPiece, palette_colors: Dict[str, object],
+                 plans: Dict[str, DistributionPlan], pipette) -> List[str]:
+    """The order to draw the planned colours in with pipette: the one with
+    the shortest trips from the tip rack to the palette, see
+    artbot.sequence.order_colours."""
+    colors = list(plans)
+    sources = [(palette_colors[color].top().point.x, palette_colors[color].top().point.y) for color in colors]
+    tips = [plans[color].num_tips for color in colors]
+    sequence = order_colours(sources, tips, tip_points(pipette, sum(tips)))
+    colors = [colors[i] for i in sequence.order]
+    protocol.comment(f'Colour order: {", ".join(art.color_map[color] for color in colors)}')
+    protocol.comment(f'Tip rack to palette travel: {sequence.distance_before:.0f} mm -> {sequence.distance_after:.0f} mm')
+    return colors
+
+
+def draw_art(
+    protocol: protocol_api.ProtocolContext,
+    art: ArtPiece,
+    canvas_locations: Dict[str, str],
+    pipette_name: str = 'p10_multi',
+    mount: str = 'right',
+    dispense_amount: float = 0.4,
+    disposal_vol: float = 2,
+    tip_rack_slot: Union[int, str] = 10,
+    palette_slot: Union[int, str] = 11,
+    touch_tip_below: Optional[float] = None,
+    touch_tip_v_offset: float = -1.0,
+    optimise_path: bool = False,
+    instrumentation_path: Optional[str] = None,
+    replicates: int = 1,
+    tip_policy: Optional[TipPolicy] = None,
+    plan_cache: Optional[str] = None,
+    optimise_palette: bool = False,
+    hover_height: Optional[float] = None,
+    strokes: bool = False,
+    validate: bool = True,
+    sequence_colours: bool = False,
+) -> None:
+    """Runs a whole ARTBot design.
+
+    canvas_locations maps each art title of the design to the deck slot of
+    its canvas, or to a list of slots to make replicate plates. With
+    replicates above 1 a p10_multi draws each pixel in that many lanes of a
+    replicate tray at once, see artbot.pipettes.ReplicatePipette.
+
+    By default the design is checked (validate, see check_art) and then
+    drawn as the template drew it. Each other setting is described by the
+    module it uses: optimise_path (artbot.paths), tip_policy
+    (artbot.policy), plan_cache (artbot.plancache), optimise_palette
+    (artbot.palette), hover_height (artbot.distribute), strokes
+    (artbot.strokes), sequence_colours (artbot.sequence) and
+    instrumentation_path (artbot.instrumentation).
+    """
+    if strokes:
+        check_strokes(protocol)
+
+    # a tip rack for our pipette
+    tiprack = load_labware(protocol, TIP_RACK, tip_rack_slot)
+
+    # a plate for all of the colors in our pallette
+    palette = load_labware(protocol, PALETTE if replicates == 1 else REPLICATE_PALETTE, palette_slot)
+
+    # set the pipette we will be using
+    pipette = get_pipette(protocol, pipette_name, mount, tip_racks=[tiprack], replicates=replicates)
+
+    # plates to create art in
+    canvas_labware = load_canvases(protocol, canvas_locations, CANVAS if replicates == 1 else REPLICATE_CANVAS)
+    if validate:
+        check_art(protocol, art, canvas_labware, dispense_amount)
+
+    # wells to dispense each color material to
+    pixels_by_color = pixel_locations(art, canvas_labware)
+
+    if optimise_palette:
+        per_refill = dispenses_per_refill(dispense_amount, pipette.max_volume, disposal_vol)
+        palette_colors = load_palette_colors(protocol, palette, art, pixels_by_color, per_refill)
+    else:
+        palette_colors = load_palette_colors(protocol, palette, art)
+    if replicates > 1:
+        protocol.comment(f'**CHECK BEFORE RUNNING** - Pour agar into lanes A to {"ABCDEFGH"[replicates - 1]} of each replicate tray')
+
+    finish = trash_point(pipette) if sequence_colours else None
+    plans = plan_colours(
+        protocol, art, pixels_by_color, palette_colors, pipette,
+        dispense_amount, disposal_vol, optimise_path, tip_policy, PlanCache(plan_cache) if plan_cache else None,
+        finish,
+    )
+    colors = colour_order(protocol, art, palette_colors, plans, pipette) if sequence_colours else list(pixels_by_color)
+
+    instrumentation = None
+    if instrumentation_path:
+        instrumentation = PipetteInstrumentation(canvas_names(canvas_labware))
+        instrumentation.attach(pipette)
+
+    for color in colors:
+        if instrumentation:
+            instrumentation.colour = art.color_map[color]
+        distribute_to_agar(
+            pipette, dispense_amount, palette_colors[color], pixels_by_color[color], disposal_vol=disposal_vol,
+            touch_tip_below=touch_tip_below, touch_tip_v_offset=touch_tip_v_offset, plan=plans[color],
+            hover_height=hover_height, strokes=strokes,
+        )
+
+    if instrumentation:
+        instrumentation.export(instrumentation_path)
+        protocol.comment(f'Pipette timings written to {instrumentation_path}')
@@ -0,0 +1,166 @@
+"""The order to draw the colours of a design in, and where each one ends.
+
+Between two colours the pipette drops its tip in the trash, picks up a new
+one from the tip rack and goes to the next colour's palette well; it does
+the same at every tip change within a colour. Tips come out of the racks in
+a fixed order, so which tips a colour gets, and how far they are from its
+palette well, depends on the colours drawn before it. Everything else about
+the changeovers is the same in any order, so order_colours picks the order
+with the shortest trips from the tip rack to the palette: exactly, over
+every subset of colours, for up to EXACT_COLOURS colours, and by moving one
+colour at a time for more.
+
+The other end of a changeover is the trip from a colour's last pixel to the
+trash. A colour's last refill is ordered as a round trip from its palette
+well (see artbot.paths.refill_order), but nothing comes back to the palette
+after it; end_near orders it from the palette well to the trash instead.
+Where a colour starts is fixed by its palette well, which every refill,
+the first included, starts from.
+
+    order = order_colours(sources, tips, tip_points(pipette, sum(tips)))
+    order.order, order.distance_before, order.distance_after
+
+draw_art does both with sequence_colours set.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .paths import PathPlan, nearest_neighbour_order, path_length, two_opt
+
+# colours ordered exactly; the search takes 2 ** EXACT_COLOURS steps
+EXACT_COLOURS = 12
+
+
+def tip_points(pipette, count: int) -> np.ndarray:
+    """The XY of the next count tips the pipette picks up, fewer when its
+    racks run out."""
+    scheduler = getattr(pipette, 'tip_scheduler', None)
+    if scheduler is not None:
+        wells = scheduler.upcoming_tips(count, pipette.channels)
+    else:
+        # the protocol API hands out the tips of a rack in plate order
+        wells = [well for tip_rack in pipette.tip_racks for well in tip_rack.wells() if well.has_tip]
+        wells = wells[::pipette.channels][:count]
+    return np.array([[well.top().point.x, well.top().point.y] for well in wells], dtype=float).reshape(-1, 2)
+
+
+def trash_point(pipette) -> np.ndarray:
+    """The XY the pipette drops its tips at."""
+    point = pipette.trash_container.wells()[0].top().point
+    return np.array([point.x, point.y])
+
+
+def _pickup_costs(sources: np.ndarray, tips: np.ndarray, tip_points: np.ndarray) -> np.ndarray:
+    """costs[c, k]: the trips to colour c's palette well from the first k
+    tips. Tips past the end of tip_points count nothing."""
+    total = int(tips.sum())
+    tip_points = np.asarray(tip_points, dtype=float).reshape(-1, 2)[:total]
+    distances = np.zeros((len(sources), total))
+    distances[:, :len(tip_points)] = np.linalg.norm(tip_points[None] - sources[:, None], axis=2)
+    costs = np.zeros((len(sources), total + 1))
+    np.cumsum(distances, axis=1, out=costs[:, 1:])
+    return costs
+
+
+def pickup_travel(order: Sequence[int], sources: np.ndarray, tips: Sequence[int], tip_points: np.ndarray) -> float:
+    """The XY travel from each tip to the palette well of the colour it is
+    for, with the colours drawn in order using tips[c] tips each."""
+    sources = np.asarray(sources, dtype=float)[:, :2]
+    tips = np.asarray(tips, dtype=np.intp)
+    costs = _pickup_costs(sources, tips, tip_points)
+    travel, used = 0.0, 0
+    for c in order:
+        travel += costs[c, used + tips[c]] - costs[c, used]
+        used += tips[c]
+    return float(travel)
+
+
+def _exact_order(costs: np.ndarray, tips: List[int]) -> List[int]:
+    """The best order by dynamic programming over the sets of colours drawn
+    first: what the next colour costs only depends on how many tips they
+    used, not on their order."""
+    n = len(tips)
+    costs = costs.tolist()
+    best = [0.0] + [float('inf')] * ((1 << n) - 1)
+    last = [0] * (1 << n)
+    used = [0] * (1 << n)
+    for subset in range(1, 1 << n):
+        lowest = (subset & -subset).bit_length() - 1
+        used[subset] = used[subset & (subset - 1)] + tips[lowest]
+        for c in range(n):
+            if subset >> c & 1:
+                before = subset ^ (1 << c)
+                value = best[before] + costs[c][used[before] + tips[c]] - costs[c][used[before]]
+                if value < best[subset] - 1e-9:
+                    best[subset], last[subset] = value, c
+    order = []
+    subset = (1 << n) - 1
+    while subset:
+        order.append(last[subset])
+        subset ^= 1 << last[subset]
+    return order[::-1]
+
+
+def _moved_order(costs: np.ndarray, tips: List[int], max_passes: int) -> List[int]:
+    """The design order improved by moving one colour to another place in
+    the order while that shortens the trips."""
+    def travel(order: List[int]) -> float:
+        total, used = 0.0, 0
+        for c in order:
+            total += costs[c, used + tips[c]] - costs[c, used]
+            used += tips[c]
+        return total
+
+    order = list(range(len(tips)))
+    length = travel(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(order)):
+            for j in range(len(order)):
+                if i == j:
+                    continue
+                moved = order[:i] + order[i + 1:]
+                moved.insert(j, order[i])
+                moved_length = travel(moved)
+                if moved_length < length - 1e-9:
+                    order, length, improved = moved, moved_length, True
+        if not improved:
+            break
+    return order
+
+
+def order_colours(sources: np.ndarray, tips: Sequence[int], tip_points: np.ndarray, max_passes: int = 10) -> PathPlan:
+    """The order to draw colours in, given the XY of their palette wells,
+    the tips each uses and the XY of the tips the pipette picks up next, in
+    order. Distances are the trips from the tip rack to the palette in the
+    given order and in the new one; ties keep the given order."""
+    sources = np.asarray(sources, dtype=float).reshape(-1, 2)[:, :2]
+    tips = [int(t) for t in tips]
+    costs = _pickup_costs(sources, np.asarray(tips, dtype=np.intp), tip_points)
+    if len(tips) <= EXACT_COLOURS:
+        order = _exact_order(costs, tips)
+    else:
+        order = _moved_order(costs, tips, max_passes)
+    before = pickup_travel(range(len(tips)), sources, tips, tip_points)
+    after = pickup_travel(order, sources, tips, tip_points)
+    if after >= before - 1e-9:
+        order, after = list(range(len(tips))), before
+    return PathPlan(np.array(order, dtype=np.intp), before, after)
+
+
+def end_near(points: np.ndarray, start: int, source: Sequence[float], end: Sequence[float],
+             max_passes: int = 10) -> Optional[np.ndarray]:
+    """An order of points that visits points[start:] last as a path from
+    source to end, or None when that is no shorter than the order they are
+    in. The points before start keep their order."""
+    points = np.asarray(points, dtype=float)[:, :2]
+    run = np.arange(start, len(points))
+    if not len(run):
+        return None
+    planned = run[two_opt(points[run], nearest_neighbour_order(points[run], source), source, max_passes, end=end)]
+    # the run is a round trip from source, so backwards is as short a tour
+    best = min((run[::-1], planned), key=lambda candidate: path_length(points, candidate, source, end))
+    if path_length(points, best, source, end) >= path_length(points, run, source, end) - 1e-9:
+        return None
+    return np.concatenate([np.arange(start), best])
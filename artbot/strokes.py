@@ -0,0 +1,146 @@
+"""Drawing runs of adjacent pixels as strokes.
+
+ARTBot pixels sit on a square lattice and most designs are lines of
+neighbouring pixels, each normally drawn as its own drop: stop, dispense,
+move on. find_strokes splits a visit order into straight runs of pixels in
+neighbouring lattice cells (see artbot.lattice), and stroke draws a run
+with one move of the gantry from its first to its last pixel during which
+the plunger dispenses the run's liquid. The two move together, so the same
+volume lands on every millimetre of the line.
+
+    cells, groups = lattice_cells(points, labware_index)
+    for start, stop in find_strokes(cells, groups):
+        pipette.move_to(dest[start])
+        stroke(pipette, vol * (stop - start), dest[stop - 1])
+
+The protocol API moves the gantry and a plunger one after the other, so
+stroke makes the move through the OT-2 hardware controller underneath the
+pipette: the same single move a dispense makes, with an XYZ target as well.
+No public call does that, so strokes rely on the controller of the
+Opentrons release they were written against, pinned in artbot.compat, and
+on the protocol core of apiLevel 2.13 and below; check_strokes says when a
+protocol cannot use them.
+"""
+import math
+from functools import partial
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from opentrons.commands import commands as cmds
+from opentrons.commands import publisher
+from opentrons.hardware_control.motion_utilities import target_position_from_absolute
+from opentrons.protocols.api_support.types import APIVersion
+from opentrons.types import Location, Point
+
+from .compat import OPENTRONS_VERSION, PINNED_RELEASE, PRIVATE_API
+from .lattice import Lattice
+
+# the last protocol API version on the legacy core, which runs stroke's move
+MAX_API_VERSION = APIVersion(2, 13)
+
+
+def check_strokes(protocol) -> None:
+    """Raises ValueError when protocol cannot draw strokes."""
+    if protocol.api_version > MAX_API_VERSION:
+        raise ValueError(f'strokes need a protocol at apiLevel {MAX_API_VERSION} or below, not {protocol.api_version}')
+    if not PRIVATE_API:
+        raise ValueError(f'strokes need Opentrons {PINNED_RELEASE}, not {OPENTRONS_VERSION}')
+
+
+def lattice_cells(points: np.ndarray, labware_index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The lattice cells of points, see artbot.lattice, and a group for
+    each: the points of a group are on one canvas, at one height and on one
+    lattice. Points on a canvas that is not a lattice get groups of one."""
+    points = np.asarray(points, dtype=float)
+    cells = np.zeros((len(points), 2), dtype=np.int64)
+    groups = np.arange(len(points))
+    keys, inverse = np.unique(np.column_stack([labware_index, points[:, 2]]), axis=0, return_inverse=True)
+    for key in range(len(keys)):
+        members = np.flatnonzero(inverse.ravel() == key)
+        try:
+            cells[members] = Lattice.infer(points[members]).encode(points[members])
+        except ValueError:
+            continue
+        groups[members] = members[0]
+    return cells, groups
+
+
+def find_strokes(cells: np.ndarray, groups: np.ndarray, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int]]:
+    """The visit order from start to stop split into strokes, as (start,
+    stop) index ranges in order. Every step of a stroke is the same step to
+    a neighbouring cell, along a row, a column or a diagonal, in one group.
+    Pixels that do not continue a stroke are strokes of one."""
+    stop = len(cells) if stop is None else stop
+    if stop - start < 2:
+        return [(i, i + 1) for i in range(start, stop)]
+
+    steps = np.diff(np.asarray(cells)[start:stop], axis=0)
+    adjacent = (np.abs(steps).max(axis=1) == 1) & (np.diff(np.asarray(groups)[start:stop]) == 0)
+
+    strokes = []
+    first = start
+    for i, step in enumerate(steps):
+        # step i goes from pixel start + i to start + i + 1, and continues
+        # the stroke when it is the stroke's first step or repeats it
+        if adjacent[i] and (first == start + i or (step == steps[first - start]).all()):
+            continue
+        strokes.append((first, start + i + 1))
+        first = start + i + 1
+    strokes.append((first, stop))
+    return strokes
+
+
+def stroke(pipette, volume: float, location: Location, rate: float = 1.0) -> None:
+    """Dispenses volume while moving in a straight line from where the
+    pipette is to location, which has to be in the same well.
+
+    The plunger runs at the pipette's dispense flow rate times rate and the
+    gantry takes as long to get to location, no faster than the pipette's
+    default speed. The command is published as a dispense into location
+    with the point it starts from as ``stroke_from``, and location becomes
+    the protocol's last location, as after a move there. See check_strokes
+    for the protocols this works in.
+    """
+    protocol_core = pipette._protocol_core
+    hardware = protocol_core.get_hardware()
+    mount = pipette._core.get_mount()
+    start = hardware.gantry_position(mount)
+    length = math.hypot(location.point.x - start.x, location.point.y - start.y)
+    flow_rate = pipette.flow_rate.dispense * rate
+    speed = min(length * flow_rate / volume, pipette.default_speed) if volume else 0.0
+    if not speed:
+        pipette.dispense(volume, rate=rate)
+        return
+
+    command = cmds.dispense(instrument=pipette, volume=volume, location=location, flow_rate=flow_rate, rate=rate)
+    command['payload']['stroke_from'] = Location(start, location.labware)
+    command['payload']['text'] = command['payload']['text'].replace('Dispensing', 'Stroking', 1)
+    with publisher.publish_context(broker=pipette.broker, command=command):
+        spec = hardware.plan_check_dispense(mount, volume, rate, None)
+        if spec is None:
+            return
+        # This is API.dispense of Opentrons 7.0.x (hardware_control/api.py):
+        # plan_check_dispense, then _backend.set_active_current for the
+        # plunger axis and one _move(..., home_flagged_axes=False) to the
+        # target of target_position_from_plunger, then remove_current_volume,
+        # or set_current_volume(0) when the move fails. Only the target
+        # differs: the gantry axes go where API.move_to would send them, from
+        # target_position_from_absolute, rather than staying where they are.
+        # _move takes the motion lock like every move of the controller.
+        target = target_position_from_absolute(
+            mount, location.point, partial(hardware.critical_point_for, cp_override=None),
+            Point(*hardware.config.left_mount_offset), Point(0, 0, 0),
+        )
+        target[spec.axis] = spec.plunger_distance
+        try:
+            hardware._backend.set_active_current({spec.axis: spec.current})
+            hardware._move(target, speed=speed, home_flagged_axes=False)
+        except Exception:
+            spec.instr.set_current_volume(0)
+            protocol_core.set_last_location(None)
+            raise
+        spec.instr.remove_current_volume(spec.volume)
+        # as InstrumentContext.move_to leaves it, for the moves planned next
+        cache_mount = mount if pipette.api_version >= APIVersion(2, 10) else None
+        protocol_core.set_last_location(location, mount=cache_mount)
@@ -0,0 +1,233 @@
+"""Tip racks that hand out tips in the order an 8 channel pipette can pick
+them up one at a time."""
+from array import array
+import math
+from typing import Dict, List, Optional, Tuple
+
+from opentrons.protocol_api import labware
+from opentrons.protocol_api.labware import Well
+
+
+class ReverseTipPickUpDirection(labware.Labware):
+    """Hands out tips bottom up and right to left (H12, G12, ... A12, H11, ... A1)
+    so that only the back nozzle of an 8 channel pipette ever lands on a tip.
+
+    Tip state is kept as a bitmap where bit ``i`` is set while the ``i``th tip
+    in pick up order is still in the rack. The bitmap is built from the core's
+    tip tracker the first time a tip is requested and is re-checked against
+    the core before a tip is handed out, so tips taken by the core (e.g. the
+    extra tips an 8 channel pick up marks as used) are never offered twice.
+    """
+    def __init__(self, labware: labware.Labware) -> None:
+        super().__init__(core= labware._core,
+            api_version= labware._api_version,
+            protocol_core= labware._protocol_core,
+            core_map= labware._core_map)
+
+        self._wells_list: List[Well] = []
+        # pick up order position -> index into self._wells_list
+        self._order = array('H')
+        # well name -> pick up order position
+        self._positions: Dict[str, int] = {}
+        # positions that are the last tip of their column in pick up order
+        self._column_ends = 0
+        self._full_mask = 0
+        self._tip_state = 0
+        self._built = False
+
+    def _build_order(self) -> None:
+        self._wells_list = self.wells()
+        index_by_name = {well.well_name: i for i, well in enumerate(self._wells_list)}
+        for column in reversed(self.columns()):
+            for well in reversed(column):
+                self._positions[well.well_name] = len(self._order)
+                self._order.append(index_by_name[well.well_name])
+            self._column_ends |= 1 << (len(self._order) - 1)
+        self._full_mask = (1 << len(self._order)) - 1
+        self._built = True
+        self._sync_from_core()
+
+    def _sync_from_core(self) -> None:
+        self._tip_state = 0
+        for position, well_index in enumerate(self._order):
+            if self._wells_list[well_index].has_tip:
+                self._tip_state |= 1 << position
+
+    @property
+    def tips_remaining(self) -> int:
+        """The number of tips left in the rack, re-read from the core."""
+        if not self._built:
+            self._build_order()
+        else:
+            self._sync_from_core()
+        return bin(self._tip_state).count("1")
+
+    def next_tip(
+        self, num_tips: int = 1, starting_tip: Optional[Well] = None
+    ) -> Optional[Well]:
+        """Finds the first run of ``num_tips`` tips in the same column, in
+        pick up order, that ends at or after ``starting_tip``, and returns
+        the well for the back nozzle: the last tip of the run, as next_tips
+        does. The core marks that well and the ``num_tips - 1`` below it as
+        used.
+
+        The pipette passes the rack's first well (A1) as ``starting_tip`` when
+        no starting tip has been set, so A1 is treated as the start of the
+        pick up order rather than its end.
+        """
+        assert num_tips > 0, f"num_tips must be positive integer, but got {num_tips}"
+        if not self._built:
+            self._build_order()
+
+        search_mask = self._full_mask
+        if starting_tip is not None and starting_tip.well_name != self._wells_list[0].well_name:
+            first = max(self._positions[starting_tip.well_name] - num_tips + 1, 0)
+            search_mask &= ~((1 << first) - 1)
+
+        crosses_column = 0
+        for k in range(num_tips - 1):
+            crosses_column |= self._column_ends >> k
+
+        while True:
+            candidates = self._tip_state
+            for k in range(1, num_tips):
+                candidates &= self._tip_state >> k
+            candidates &= search_mask & ~crosses_column
+            if not candidates:
+                return None
+
+            position = (candidates & -candidates).bit_length() - 1
+            stale = 0
+            for k in range(num_tips):
+                if not self._wells_list[self._order[position + k]].has_tip:
+                    stale |= 1 << (position + k)
+            if not stale:
+                return self._wells_list[self._order[position + num_tips - 1]]
+            self._tip_state &= ~stale
+
+    def next_tips(self, num_tips: int) -> Optional[Well]:
+        """The well to put the back nozzle of an 8 channel pipette on to pick
+        up ``num_tips`` tips at once, or None.
+
+        The tips are the lowest ``num_tips`` left in a column, so the nozzles
+        below them hang over empty spaces or past the front of the rack and
+        only the back ``num_tips`` nozzles get a tip.
+        """
+        assert num_tips > 0, f"num_tips must be positive integer, but got {num_tips}"
+        if not self._built:
+            self._build_order()
+        else:
+            self._sync_from_core()
+        position = self._lowest_run(self._tip_state, num_tips)
+        if position is None:
+            return None
+        return self._wells_list[self._order[position + num_tips - 1]]
+
+    def _lowest_run(self, tip_state: int, num_tips: int) -> Optional[int]:
+        """The pick up order position of the first of the lowest num_tips
+        tips left in the first column that has them, in tip_state."""
+        rows = len(self.columns()[0])
+        column_mask = (1 << rows) - 1
+        run = (1 << num_tips) - 1
+        for column_start in range(0, len(self._order), rows):
+            column = (tip_state >> column_start) & column_mask
+            if not column:
+                continue
+            lowest = (column & -column).bit_length() - 1
+            if lowest + num_tips <= rows and (column >> lowest) & run == run:
+                return column_start + lowest
+        return None
+
+    def upcoming_tips(self, count: int, num_tips: int = 1) -> List[Well]:
+        """The wells the next count pick ups of num_tips tips go to, as
+        next_tips hands them out, without taking any tips. Fewer when the
+        rack runs out."""
+        assert num_tips > 0, f"num_tips must be positive integer, but got {num_tips}"
+        if not self._built:
+            self._build_order()
+        else:
+            self._sync_from_core()
+        tip_state = self._tip_state
+        wells: List[Well] = []
+        while len(wells) < count:
+            position = self._lowest_run(tip_state, num_tips)
+            if position is None:
+                break
+            wells.append(self._wells_list[self._order[position + num_tips - 1]])
+            tip_state &= ~(((1 << num_tips) - 1) << position)
+        return wells
+
+    def use_tips(self, start_well: Well, num_channels: int = 1) -> None:
+        super().use_tips(start_well, num_channels)
+        if self._built:
+            self._sync_from_core()
+
+    def return_tips(self, start_well: Well, num_channels: int = 1) -> None:
+        super().return_tips(start_well, num_channels)
+        if self._built:
+            self._sync_from_core()
+
+    def reset(self) -> None:
+        super().reset()
+        if self._built:
+            self._tip_state = self._full_mask
+
+class TipScheduler:
+    """Hands out single channel safe tips across all of a pipette's racks.
+
+    Racks are used in order and each rack hands out its tips in pick up order,
+    so the tip returned is always the lowest one left in its column and the
+    other nozzles of an 8 channel pipette never land on a tip. The scheduler
+    remembers which rack it is on, so finding the next tip does not rescan
+    exhausted racks.
+    """
+    def __init__(self, tip_racks: List[ReverseTipPickUpDirection]) -> None:
+        self._tip_racks = tip_racks
+        self._current_rack = 0
+
+    def next_tip(self, num_tips: int = 1) -> Optional[Tuple[ReverseTipPickUpDirection, Well]]:
+        """The rack and well of the next tip to pick up, or None if all racks
+        are empty. With num_tips above 1 the well is where the back nozzle
+        goes to pick up that many tips, see ReverseTipPickUpDirection.next_tips."""
+        while self._current_rack < len(self._tip_racks):
+            tip_rack = self._tip_racks[self._current_rack]
+            tip = tip_rack.next_tip() if num_tips == 1 else tip_rack.next_tips(num_tips)
+            if tip is not None:
+                return tip_rack, tip
+            self._current_rack += 1
+        return None
+
+    def upcoming_tips(self, count: int, num_tips: int = 1) -> List[Well]:
+        """The wells of the next count pick ups, across the racks left, without
+        taking any tips. Fewer when the racks run out."""
+        wells: List[Well] = []
+        for tip_rack in self._tip_racks[self._current_rack:]:
+            if len(wells) >= count:
+                break
+            wells.extend(tip_rack.upcoming_tips(count - len(wells), num_tips))
+        return wells
+
+    @property
+    def tips_remaining(self) -> int:
+        """The number of tips left across all racks."""
+        return sum(
+            tip_rack.tips_remaining for tip_rack in self._tip_racks[self._current_rack:]
+        )
+
+    def racks_needed(self, num_tips: int) -> int:
+        """The number of racks, counting from the rack in use, that ``num_tips``
+        more tips will take. Past the loaded racks full racks are assumed, so a
+        result larger than the racks left means the run will run out of tips."""
+        racks = 0
+        for tip_rack in self._tip_racks[self._current_rack:]:
+            if num_tips <= 0:
+                return racks
+            num_tips -= tip_rack.tips_remaining
+            racks += 1
+        if num_tips > 0 and self._tip_racks:
+            tips_per_rack = len(self._tip_racks[0].wells())
+            racks += math.ceil(num_tips / tips_per_rack)
+        return racks
+
+    def reset(self) -> None:
+        self._current_rack = 0
@@ -0,0 +1,268 @@
+"""Checks an ARTBot design before it is drawn.
+
+    python -m artbot.validate seans-name [--vol 0.4] [--canvas bioartbot_petriplate_90mm_round]
+    python -m artbot.validate protocol.py
+
+A design is checked one canvas at a time, with the pixels of all its colours
+together as an array of millimetres from the centre of the canvas well:
+
+- bounds: every pixel has to be in the well, within its radius, or its
+  length and width, and its depth, or the tip is sent into the plate's
+  wall (an error). Pixels are placed as artbot.canvas places them, so a
+  design keeps its shape on a replicate tray lane. A droplet that reaches
+  over the edge of the agar is a warning.
+- crowding: pixels closer together than half a droplet, in any colours,
+  are drawn as one smeared drop rather than as the design (an error), e.g.
+  a design for a round plate drawn on a lane 8 mm wide.
+- duplicates: a pixel listed twice for one colour is dispensed twice.
+- collisions: the same pixel in two colours mixes them.
+- overlap: the droplets of neighbouring pixels of different colours touch
+  and run together, a warning. A droplet is taken to sit on the agar as a spherical
+  cap with a contact angle of CONTACT_ANGLE, so its footprint grows with
+  the cube root of the dispense volume.
+
+Nearby pixels are found by sorting them into a grid of cells one droplet
+wide and only comparing pixels in neighbouring cells, all in NumPy, a chunk
+of candidate pairs at a time, so memory stays small however many pixels
+share a cell. A design of 100,000 pixels is checked in a fraction of a
+second; time grows with the pairs of pixels that are close. draw_art
+checks every design once its canvases are loaded, before anything moves:
+errors stop the run and warnings are written to the run log.
+"""
+import argparse
+import math
+import sys
+from dataclasses import dataclass, field
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .art import ArtPiece, load_art
+from .canvas import canvas_scale
+from .convert import extract_art
+from .labware import default_registry
+
+# degrees, for a water based drop on agar
+CONTACT_ANGLE = 30.0
+
+# pixels closer than this, in mm, are the same pixel
+SAME_PIXEL = 0.1
+
+# findings give this many pixels as examples
+EXAMPLES = 5
+
+# candidate pairs of pixels compared at once
+CHUNK = 1 << 18
+
+# offsets to the cell itself and half the cells around it, so each pair of
+# neighbouring cells is compared once
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+@dataclass
+class Finding:
+    """count pixels, or pairs of pixels, with the same problem."""
+    kind: str
+    severity: str
+    message: str
+    count: int
+    examples: List[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        text = f'{self.severity}: {self.count} {self.message}'
+        if self.examples:
+            text += ', e.g. ' + '; '.join(self.examples)
+        return text
+
+
+@dataclass
+class ValidationReport:
+    pixels: int
+    droplet_diameter: float
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether nothing stops the design from being drawn."""
+        return not any(finding.severity == 'error' for finding in self.findings)
+
+    def describe(self) -> str:
+        lines = [f'{self.pixels} pixels, droplets {self.droplet_diameter:.2f} mm across']
+        lines.extend(finding.describe() for finding in self.findings)
+        if not self.findings:
+            lines.append('no problems found')
+        return '\n'.join(lines)
+
+
+def droplet_diameter(volume: float, contact_angle: float = CONTACT_ANGLE) -> float:
+    """The diameter in mm of the footprint of a drop of volume uL, which is
+    mm^3, sitting as a spherical cap."""
+    theta = math.radians(contact_angle)
+    cap = (2 - 3 * math.cos(theta) + math.cos(theta) ** 3) / (3 * math.sin(theta) ** 3)
+    return 2 * (volume / (math.pi * cap)) ** (1 / 3)
+
+
+def close_pair_chunks(xy: np.ndarray, distance: float, chunk: int = CHUNK) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """The index pairs (i, j), i < j, of points less than distance apart, a
+    few at a time: each chunk comes from at most chunk candidate pairs."""
+    xy = np.asarray(xy, dtype=float)[:, :2]
+    n = len(xy)
+    if n < 2 or not distance > 0:
+        return
+    cells = np.floor(xy / distance).astype(np.int64)
+    cells -= cells.min(axis=0)
+    # room for a row either side, so neighbouring keys never wrap onto a cell
+    width = int(cells[:, 1].max()) + 3
+    keys = cells[:, 0] * width + cells[:, 1] + 1
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    for dcol, drow in _HALF_NEIGHBOURHOOD:
+        target = keys + dcol * width + drow
+        lo = np.searchsorted(sorted_keys, target, 'left')
+        counts = np.searchsorted(sorted_keys, target, 'right') - lo
+        ends = np.cumsum(counts)
+        start = 0
+        while start < n:
+            before = int(ends[start - 1]) if start else 0
+            stop = min(max(int(np.searchsorted(ends, before + chunk, 'right')), start + 1), n)
+            total = int(ends[stop - 1]) - before
+            if total:
+                # every point from start to stop paired with each point in
+                # its target cell
+                block = counts[start:stop]
+                i = np.repeat(np.arange(start, stop), block)
+                j = order[np.repeat(lo[start:stop] - (ends[start:stop] - block - before), block) + np.arange(total)]
+                keep = (xy[i, 0] - xy[j, 0]) ** 2 + (xy[i, 1] - xy[j, 1]) ** 2 < distance * distance
+                if (dcol, drow) == (0, 0):
+                    keep &= i < j
+                i, j = i[keep], j[keep]
+                if len(i):
+                    yield np.minimum(i, j), np.maximum(i, j)
+            start = stop
+
+
+def close_pairs(xy: np.ndarray, distance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """The index pairs (i, j), i < j, of points less than distance apart."""
+    chunks = list(close_pair_chunks(xy, distance))
+    if not chunks:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate([i for i, _ in chunks]), np.concatenate([j for _, j in chunks])
+
+
+def well_shape(well) -> Tuple[np.ndarray, bool]:
+    """The half sizes in mm of a loaded well and whether it is round."""
+    centre = well.from_center_cartesian(0, 0, 0)
+    corner = well.from_center_cartesian(1, 1, 1)
+    return np.array([corner.x - centre.x, corner.y - centre.y, corner.z - centre.z]), well.diameter is not None
+
+
+def validate_art(art: ArtPiece, volume: float, half_size: Sequence[float] = (40.0, 40.0, 6.1), circular: bool = True,
+                 contact_angle: float = CONTACT_ANGLE) -> ValidationReport:
+    """Checks every canvas of art, drawn with volume uL drops on wells of
+    half_size, the half width, length and depth in mm, and round when
+    circular. The default is the 80 mm well of the ARTBot petri plate."""
+    half_size = np.asarray(half_size, dtype=float)
+    scale = canvas_scale(half_size)
+    diameter = droplet_diameter(volume, contact_angle)
+    colors = art.colors
+    names = [art.color_map.get(color, color) for color in colors]
+
+    out, over_edge, crowded, duplicates, collisions, overlaps = [], [], [], [], [], []
+    counts = dict.fromkeys(('out', 'over_edge', 'crowded', 'duplicates', 'collisions', 'overlaps'), 0)
+    pixels = 0
+
+    def pixel(title: str, color: np.ndarray, index: np.ndarray, mm: np.ndarray, k: int) -> str:
+        return f'{names[color[k]]} pixel {index[k]} on {title} at ({mm[k, 0]:.1f}, {mm[k, 1]:.1f}) mm'
+
+    for title in art.art_titles:
+        parts = [(c, np.asarray(art.pixels_by_color_by_artpiece[color][title]))
+                 for c, color in enumerate(colors) if title in art.pixels_by_color_by_artpiece[color]]
+        if not parts:
+            continue
+        normalised = np.concatenate([xyz for _, xyz in parts])
+        color = np.concatenate([np.full(len(xyz), c) for c, xyz in parts])
+        index = np.concatenate([np.arange(len(xyz)) for _, xyz in parts])
+        mm = normalised * scale
+        pixels += len(mm)
+
+        # bounds, against the wall of the well and its depth
+        if circular:
+            distance = np.hypot(mm[:, 0], mm[:, 1])
+            outside = distance > half_size[0] * (1 + 1e-9)
+            edge = distance + diameter / 2 > half_size[0]
+        else:
+            outside = (np.abs(mm[:, :2]) > half_size[:2] * (1 + 1e-9)).any(axis=1)
+            edge = (np.abs(mm[:, :2]) + diameter / 2 > half_size[:2]).any(axis=1)
+        outside |= np.abs(normalised[:, 2]) > 1 + 1e-9
+        edge &= ~outside
+        counts['out'] += int(outside.sum())
+        counts['over_edge'] += int(edge.sum())
+        out.extend(pixel(title, color, index, mm, k) for k in np.flatnonzero(outside)[:EXAMPLES - len(out)])
+        over_edge.extend(pixel(title, color, index, mm, k) for k in np.flatnonzero(edge)[:EXAMPLES - len(over_edge)])
+
+        # pairs of pixels: the same pixel, drops that merge, or droplets
+        # that touch
+        for i, j in close_pair_chunks(mm, max(diameter, SAME_PIXEL)):
+            gap2 = (mm[i, 0] - mm[j, 0]) ** 2 + (mm[i, 1] - mm[j, 1]) ** 2
+            same_pixel = gap2 < SAME_PIXEL ** 2
+            same_color = color[i] == color[j]
+            merged = ~same_pixel & (gap2 < (diameter / 2) ** 2)
+            for kind, examples, found in (
+                ('crowded', crowded, merged),
+                ('duplicates', duplicates, same_pixel & same_color),
+                ('collisions', collisions, same_pixel & ~same_color),
+                ('overlaps', overlaps, ~same_pixel & ~merged & ~same_color & (gap2 < diameter ** 2)),
+            ):
+                counts[kind] += int(found.sum())
+                # past the first few, pairs are only counted
+                wanted = EXAMPLES - len(examples)
+                if wanted > 0:
+                    examples.extend(
+                        f'{pixel(title, color, index, mm, a)} and {pixel(title, color, index, mm, b)}'
+                        for a, b in zip(i[found][:wanted], j[found][:wanted])
+                    )
+
+    report = ValidationReport(pixels, diameter)
+    for kind, severity, message, examples in (
+        ('out', 'error', 'pixels outside the well', out),
+        ('over_edge', 'warning', 'droplets over the edge of the agar', over_edge),
+        ('crowded', 'error', 'pairs of pixels closer than half a droplet, which merge into one drop', crowded),
+        ('duplicates', 'warning', 'pixels listed twice for the same colour', duplicates),
+        ('collisions', 'warning', 'pixels in two colours', collisions),
+        ('overlaps', 'warning', 'pairs of droplets of different colours that touch', overlaps),
+    ):
+        if counts[kind]:
+            report.findings.append(Finding(kind, severity, message, counts[kind], examples[:EXAMPLES]))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('designs', nargs='+', help='art names or files, or Protocol Builder protocols (.py)')
+    parser.add_argument('--vol', type=float, default=0.4, help='dispense volume in uL')
+    parser.add_argument('--canvas', default='bioartbot_petriplate_90mm_round', help='canvas labware load name')
+    parser.add_argument('--contact-angle', type=float, default=CONTACT_ANGLE, help='droplet contact angle in degrees')
+    args = parser.parse_args()
+
+    registry = default_registry()
+    definition = registry.definition(args.canvas)
+    circular = definition['wells'][registry.geometry(args.canvas).wells[0]]['shape'] == 'circular'
+    half_size = registry.geometry(args.canvas).half_sizes[0]
+
+    ok = True
+    for design in args.designs:
+        if design.endswith('.py'):
+            with open(design) as f:
+                art = extract_art(f.read())
+        else:
+            art = load_art(design)
+        report = validate_art(art, args.vol, half_size, circular, args.contact_angle)
+        print(f'{design}: {report.describe()}')
+        ok = ok and report.ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+from opentrons import protocol_api
+from artbot.art import load_art
+from artbot.runtime import draw_art
+
+TIP_RACK_LOCATION = 10
+
+# lanes of the replicate tray to draw in, one nozzle each (2 to 8)
+REPLICATES = 4
+
+metadata = {
+    'apiLevel': '2.8',
+    'protocolName': 'Stripes 8 channel replicates',
+    'author': 'Tim Dobbs and Counter Culture Labs',
+    'source': 'ARTBot Protocol Builder',
+    'description': """Protocol for drawing bio-art.
+                      Built from a template and the designer
+                      at bioartbot.org"""
+    }
+
+
+def run(protocol: protocol_api.ProtocolContext):
+    draw_art(
+        protocol,
+        load_art('replicate-stripes'),
+        canvas_locations={'replicate-stripes#1': '5'},
+        pipette_name='p10_multi',
+        mount='right',
+        dispense_amount=0.4,
+        tip_rack_slot=TIP_RACK_LOCATION,
+        replicates=REPLICATES,
+    )
@@ -0,0 +1,20 @@
+from opentrons import protocol_api
+from artbot.replay import load_program, replay
+
+# compiled from the design with
+#   python -m artbot.compiler artbot/programs/seans-name.json
+PROGRAM = 'seans-name'
+
+metadata = {
+    'apiLevel': '2.8',
+    'protocolName': 'Seans name 8 channel, compiled',
+    'author': 'Tim Dobbs and Counter Culture Labs',
+    'source': 'ARTBot Protocol Builder',
+    'description': """Protocol for drawing bio-art.
+                      Built from a template and the designer
+                      at bioartbot.org"""
+    }
+
+
+def run(protocol: protocol_api.ProtocolContext):
+    replay(protocol, load_program(PROGRAM))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from artbot.art import ArtPiece, load_art, save_art
+
+
+def test_save_and_load_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    art = ArtPiece(
+        {
+            '1': {'a#1': rng.uniform(-1, 1, (7, 3)), 'a#2': np.column_stack([rng.uniform(-1, 1, (3, 2)), np.full(3, 0.99)])},
+            '2': {'a#1': np.empty((0, 3))},
+        },
+        {'1': 'red', '2': 'blue'},
+    )
+    path = str(tmp_path / 'design.art')
+    save_art(path, art)
+    for mmap in (True, False):
+        loaded = load_art(path, mmap=mmap)
+        assert loaded.color_map == art.color_map
+        assert loaded.colors == art.colors
+        assert loaded.art_titles == art.art_titles
+        for color, pixels_by_artpiece in art.pixels_by_color_by_artpiece.items():
+            for title, pixels in pixels_by_artpiece.items():
+                assert np.array_equal(np.asarray(loaded.pixels_by_color_by_artpiece[color][title]), np.asarray(pixels))
+
+
+def test_shipped_designs_load():
+    art = load_art('seans-name')
+    assert sum(art.num_pixels(color) for color in art.colors) == 68
+
+
+def test_not_an_art_file(tmp_path):
+    path = tmp_path / 'design.art'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        load_art(str(path))
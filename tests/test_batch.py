@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from artbot import batch
+from artbot.batch import find_protocols, format_summary, run_batch, simulate_one
+
+PROTOCOL = '''
+metadata = {{'apiLevel': '2.8'}}
+
+
+def run(protocol):
+    tip_rack = protocol.load_labware('opentrons_96_tiprack_20ul', 1)
+    pipette = protocol.load_instrument('p20_single_gen2', 'right', tip_racks=[tip_rack])
+    pipette.pick_up_tip()
+    pipette.drop_tip()
+    {}
+'''
+
+
+@pytest.fixture
+def protocols(tmp_path):
+    bodies = {
+        'fails.py': "raise RuntimeError('no paint')",
+        'passes.py': 'pass',
+        'sleeps.py': 'import time; time.sleep(30)',
+    }
+    for name, body in bodies.items():
+        (tmp_path / name).write_text(PROTOCOL.format(body))
+    (tmp_path / 'notes.txt').write_text('')
+    return tmp_path
+
+
+def test_find_protocols(protocols):
+    found = find_protocols([str(protocols), str(protocols / 'passes.py')])
+    assert [path.rsplit('/', 1)[-1] for path in found] == ['fails.py', 'passes.py', 'sleeps.py', 'passes.py']
+
+
+def test_results_keep_the_order_given(protocols):
+    paths = find_protocols([str(protocols)])
+    results = run_batch(paths, jobs=2, timeout=5, labware_paths=[str(protocols)])
+    assert [result.protocol for result in results] == ['fails.py', 'passes.py', 'sleeps.py']
+    fails, passes, sleeps = results
+    assert not fails.ok and 'no paint' in fails.error
+    assert passes.ok and passes.tips == 1
+    assert not sleeps.ok and sleeps.error == 'timed out after 5 s'
+    summary = format_summary(results, 1.0, 2)
+    assert summary.splitlines()[-1].startswith('1 passed, 2 failed')
+
+
+def test_a_dead_worker_fails_only_its_protocol(protocols):
+    (protocols / 'crashes.py').write_text(PROTOCOL.format('import os; os._exit(1)'))
+    paths = [str(protocols / name) for name in ('crashes.py', 'passes.py', 'passes.py')]
+    results = run_batch(paths, jobs=2, timeout=5, labware_paths=[str(protocols)])
+    assert [(result.ok, result.error) for result in results] == [
+        (False, 'worker process died'), (True, ''), (True, ''),
+    ]
+
+
+class RecordingPool(ProcessPoolExecutor):
+    sizes = []
+
+    def __init__(self, max_workers=None, **kwargs):
+        self.sizes.append(max_workers)
+        super().__init__(max_workers, **kwargs)
+
+
+def test_a_broken_pool_is_replaced_by_a_full_one(protocols, monkeypatch):
+    # dies the first time it runs, then passes
+    marker = protocols / 'crashed'
+    (protocols / 'flaky.py').write_text(PROTOCOL.format(
+        f'import os; os.path.exists({str(marker)!r}) or (open({str(marker)!r}, "w").close(), os._exit(1))'
+    ))
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', RecordingPool)
+    RecordingPool.sizes = []
+    paths = [str(protocols / name) for name in ('flaky.py', 'passes.py', 'passes.py')]
+    results = run_batch(paths, jobs=2, timeout=5, labware_paths=[str(protocols)])
+    assert all(result.ok for result in results)
+    assert RecordingPool.sizes == [2, 2]
+
+
+def test_a_pool_that_breaks_again_is_run_one_at_a_time(protocols, monkeypatch):
+    (protocols / 'crashes.py').write_text(PROTOCOL.format('import os; os._exit(1)'))
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', RecordingPool)
+    RecordingPool.sizes = []
+    paths = [str(protocols / name) for name in ('crashes.py', 'passes.py')]
+    results = run_batch(paths, jobs=2, timeout=5, labware_paths=[str(protocols)])
+    assert [result.ok for result in results] == [False, True]
+    assert RecordingPool.sizes[:3] == [2, 2, 1]
+
+
+def test_no_timeout_without_sigalrm(protocols, monkeypatch):
+    (protocols / 'naps.py').write_text(PROTOCOL.format('import time; time.sleep(0.5)'))
+    monkeypatch.setattr(batch, 'HAS_TIMEOUT', False)
+    assert simulate_one(str(protocols / 'naps.py'), timeout=0.1).ok
@@ -0,0 +1,28 @@
+import os
+
+from opentrons import simulate
+from opentrons.commands import types as command_types
+from opentrons.util import entrypoint_util
+
+from artbot.benchmark import TEST_PROTOCOLS, CommandRecorder
+from artbot.compiler import compile_art, flatten, save_program
+from artbot.replay import PROGRAM_DIR, load_program, replay
+
+
+def test_shipped_program_is_up_to_date(tmp_path):
+    program = load_program('seans-name')
+    path = tmp_path / 'seans-name.json'
+    save_program(compile_art(program['description']), str(path))
+    with open(os.path.join(PROGRAM_DIR, 'seans-name.json')) as f:
+        assert path.read_text() == f.read()
+
+
+def test_replay_sends_the_compiled_commands():
+    program = load_program('seans-name')
+    extra_labware = entrypoint_util.labware_from_paths([TEST_PROTOCOLS])
+    protocol = simulate.get_protocol_api(
+        '2.8', extra_labware={uri: found.definition for uri, found in extra_labware.items()})
+    recorder = CommandRecorder()
+    protocol.broker.subscribe(command_types.COMMAND, recorder.on_message)
+    replay(protocol, program)
+    assert flatten(recorder.messages, program['description']['touch_tip_v_offset']) == program['commands']
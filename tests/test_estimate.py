@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from artbot.benchmark import TEST_PROTOCOLS, record_commands
+from artbot.estimate import RobotModel, axis_seconds, estimate_run
+
+
+@pytest.fixture(scope='module')
+def messages():
+    return record_commands(os.path.join(TEST_PROTOCOLS, 'OriginalMulticolorPerimeter.py'))
+
+
+def test_axis_seconds():
+    # 400 mm at 400 mm/s takes 1 s, plus 0.2 s to speed up and slow down
+    assert axis_seconds(400, 400, 2000) == pytest.approx(1.2)
+    # too short to reach speed
+    assert axis_seconds(20, 400, 2000) == pytest.approx(0.2)
+    assert axis_seconds(-20, 400, 2000) == pytest.approx(0.2)
+    # both profiles meet where the move just reaches speed
+    assert axis_seconds(80, 400, 2000) == pytest.approx(0.4)
+
+
+def test_every_second_is_charged_to_a_colour(messages):
+    estimate = estimate_run(messages)
+    assert set(estimate.seconds_by_colour) == {'fluorescent yellow', 'indigo', 'peach', 'pink', 'teal'}
+    assert sum(estimate.seconds_by_colour.values()) == pytest.approx(estimate.total_seconds)
+    assert sum(estimate.seconds_by_command.values()) == pytest.approx(estimate.total_seconds)
+
+
+def test_model_options(messages):
+    estimate = estimate_run(messages)
+    tips = sum(message['name'] == 'command.PICK_UP_TIP' for message in messages)
+    # the Original protocols use a plain pipette, which presses three times
+    one_press = estimate_run(messages, RobotModel(pick_up_presses=1))
+    assert estimate.total_seconds - one_press.total_seconds == pytest.approx(2 * tips)
+    assert estimate_run(messages, RobotModel(xy_speed=800)).total_seconds < estimate.total_seconds
@@ -0,0 +1,101 @@
+import csv
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from artbot.instrumentation import OFF_CANVAS, PipetteInstrumentation
+
+
+class FakePipette:
+    """Runs each call in one tick of the clock; dispense moves first, the
+    way InstrumentContext.dispense calls move_to."""
+    def __init__(self, clock):
+        self.clock = clock
+
+    def aspirate(self, volume, location=None):
+        self.clock.tick()
+
+    def dispense(self, volume, location=None):
+        if location is not None:
+            self.move_to(location)
+        self.clock.tick()
+
+    def move_to(self, location):
+        self.clock.tick()
+
+    def touch_tip(self, location=None):
+        self.clock.tick()
+
+    def pick_up_tip(self, location=None):
+        self.clock.tick()
+
+    def drop_tip(self, location=None):
+        self.clock.tick()
+
+
+class Clock:
+    def __init__(self, step):
+        self.now, self.step = 0.0, step
+
+    def tick(self):
+        self.now += self.step
+
+    def __call__(self):
+        return self.now
+
+
+def run(step=0.002):
+    clock = Clock(step)
+    plate, palette = object(), object()
+    pixel, source = SimpleNamespace(parent=plate), SimpleNamespace(parent=palette)
+    instrumentation = PipetteInstrumentation(canvas_names={plate: 'art#1'}, clock=clock)
+    pipette = FakePipette(clock)
+    instrumentation.attach(pipette)
+    instrumentation.colour = 'pink'
+    pipette.pick_up_tip()
+    pipette.aspirate(5, source)
+    pipette.move_to(pixel)
+    pipette.dispense(0.2)
+    pipette.dispense(0.2, pixel)
+    pipette.drop_tip()
+    return instrumentation
+
+
+def test_calls_are_filed_by_colour_and_canvas():
+    stats = run().stats
+    assert {key: value.count for key, value in stats.items()} == {
+        ('pick_up_tip', 'pink', OFF_CANVAS): 1,
+        ('aspirate', 'pink', OFF_CANVAS): 1,
+        ('move_to', 'pink', 'art#1'): 1,
+        ('dispense', 'pink', 'art#1'): 2,
+        ('drop_tip', 'pink', OFF_CANVAS): 1,
+    }
+
+
+def test_inner_calls_are_part_of_the_outer_call():
+    stats = run().stats
+    # the second dispense moved first, which took it two ticks
+    assert stats[('dispense', 'pink', 'art#1')].max == pytest.approx(0.004)
+    assert stats[('move_to', 'pink', 'art#1')].count == 1
+
+
+def test_histogram_buckets():
+    stats = run(step=0.25).stats[('dispense', 'pink', 'art#1')]
+    # 0.25 s falls in the bucket up to 0.3 s and 0.5 s in the one up to 1 s
+    assert stats.histogram == [0, 0, 0, 0, 0, 1, 1, 0, 0, 0]
+    assert (stats.total, stats.max, stats.mean) == (0.75, 0.5, 0.375)
+
+
+def test_export(tmp_path):
+    instrumentation = run()
+    instrumentation.export(str(tmp_path / 'timings.json'))
+    report = json.loads((tmp_path / 'timings.json').read_text())
+    assert report['buckets'] == list(instrumentation.buckets)
+    by_colour = {row['command']: row['count'] for row in report['stats'] if row['group'] == 'colour'}
+    assert by_colour == {'pick_up_tip': 1, 'aspirate': 1, 'move_to': 1, 'dispense': 2, 'drop_tip': 1}
+    instrumentation.export(str(tmp_path / 'timings.csv'))
+    with open(tmp_path / 'timings.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(report['stats'])
+    assert {row['name'] for row in rows if row['group'] == 'canvas'} == {'art#1', OFF_CANVAS}
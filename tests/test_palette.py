@@ -0,0 +1,32 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from artbot.palette import assign_wells, palette_travel, refill_target
+
+
+def test_most_refills_get_the_closest_wells():
+    assert assign_wells([3, 10, 1], [5, 1, 9, 3]).tolist() == [3, 1, 0]
+
+
+def test_ties_keep_colour_and_plate_order():
+    assert assign_wells([2, 2], [4, 4, 4]).tolist() == [0, 1]
+
+
+def test_too_many_colours():
+    with pytest.raises(ValueError):
+        assign_wells([1, 2, 3], [1, 2])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_assignment_is_the_shortest(seed):
+    rng = np.random.default_rng(seed)
+    refills = rng.integers(1, 20, 5)
+    distances = rng.uniform(10, 100, 6)
+    best = min(palette_travel(refills, distances, wells) for wells in permutations(range(6), 5))
+    assert palette_travel(refills, distances, assign_wells(refills, distances)) == pytest.approx(best)
+
+
+def test_refill_target_weights_by_refills():
+    assert refill_target([[0, 0], [10, 0]], [1, 3]).tolist() == [7.5, 0]
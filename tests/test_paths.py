@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from artbot.lattice import GridIndex, grid_cells
+from artbot.paths import nearest_neighbour_order, path_length, refill_length, refill_order, two_opt
+
+
+def brute_nearest_neighbour(points, start=None):
+    left = list(range(len(points)))
+    current = points[0] if start is None else np.asarray(start, dtype=float)
+    order = []
+    while left:
+        offsets = points[left] - current
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        nearest = left[int(np.lexsort((left, distances))[0])]
+        order.append(nearest)
+        left.remove(nearest)
+        current = points[nearest]
+    return order
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_nearest_neighbour_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-40, 40, (300, 2))
+    # far outliers make the ring search fall back to every point
+    points[:5] *= 20
+    start = rng.uniform(-40, 40, 2)
+    assert nearest_neighbour_order(points).tolist() == brute_nearest_neighbour(points)
+    assert nearest_neighbour_order(points, start).tolist() == brute_nearest_neighbour(points, start)
+
+
+def test_nearest_neighbour_ties_go_to_the_lowest_index():
+    points = np.array([[0, 1], [-1, 0], [1, 0], [0, -1]], dtype=float)
+    assert nearest_neighbour_order(points, (0, 0)).tolist() == [0, 1, 3, 2]
+
+
+def test_ring_finds_the_points_radius_cells_away():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-10, 10, (500, 2))
+    cells = grid_cells(points, 1.5)
+    index = GridIndex(cells)
+    for radius in range(4):
+        found = sorted(index.ring((0, 0), radius))
+        expected = np.flatnonzero(np.abs(cells).max(axis=1) == radius).tolist()
+        assert found == expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_two_opt_keeps_the_points_and_never_lengthens(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 80, (200, 2))
+    start, end = (-10.0, -10.0), (90.0, 90.0)
+    order = rng.permutation(len(points))
+    for fixed in ({}, {'start': start}, {'start': start, 'end': end}):
+        improved = two_opt(points, order, **fixed)
+        assert sorted(improved.tolist()) == list(range(len(points)))
+        assert path_length(points, improved, **fixed) <= path_length(points, order, **fixed) + 1e-9
+
+
+def test_two_opt_uncrosses_a_square():
+    points = np.array([[0, 0], [1, 1], [1, 0], [0, 1]], dtype=float)
+    order = two_opt(points, np.arange(4), start=(0.0, -1.0))
+    assert path_length(points, order, (0.0, -1.0)) == pytest.approx(4.0)
+
+
+def test_refill_order_is_a_permutation_and_shorter():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-40, 40, (400, 2))
+    plan = refill_order(points, 19, (100.0, 0.0))
+    assert sorted(plan.order.tolist()) == list(range(len(points)))
+    assert plan.distance_after == pytest.approx(refill_length(points, 19, plan.order, (100.0, 0.0)))
+    assert plan.distance_after < plan.distance_before
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+from artbot.plancache import CachedPlan, PlanCache
+from artbot.planning import plan_distribution
+
+
+def entry(order=None):
+    return CachedPlan(order, 12.5, 10.0, plan_distribution(200, 0.4, 20, 2))
+
+
+def test_put_and_get(tmp_path):
+    cache = PlanCache(str(tmp_path))
+    points = np.arange(12.0).reshape(4, 3)
+    key = cache.key(points, colour='red', vol=0.4)
+    assert cache.get(key) is None
+    cache.put(key, entry(np.array([3, 1, 2, 0])))
+    cached = cache.get(key)
+    assert cached.order.tolist() == [3, 1, 2, 0]
+    assert cached.plan == entry().plan
+    assert (cached.distance_before, cached.distance_after) == (12.5, 10.0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_keys_follow_points_and_settings():
+    points = np.arange(12.0).reshape(4, 3)
+    key = PlanCache.key(points, colour='red', vol=0.4)
+    assert key == PlanCache.key(points.copy(), vol=0.4, colour='red')
+    assert key != PlanCache.key(points[::-1], colour='red', vol=0.4)
+    assert key != PlanCache.key(points, colour='red', vol=0.2)
+
+
+def test_half_written_entries_are_misses(tmp_path):
+    cache = PlanCache(str(tmp_path))
+    key = cache.key(np.zeros((1, 3)))
+    (tmp_path / (key + '.json')).write_text('{"order": ')
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    cache = PlanCache(str(tmp_path), max_entries=2)
+    keys = [cache.key(np.full((1, 3), i)) for i in range(3)]
+    for age, key in enumerate(keys[:2]):
+        cache.put(key, entry())
+        os.utime(tmp_path / (key + '.json'), (age, age))
+    cache.get(keys[0])
+    cache.put(keys[2], entry())
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
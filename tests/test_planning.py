@@ -0,0 +1,75 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from artbot.planning import dispenses_per_refill, plan_distribution
+from artbot.policy import TipLimits, TipPolicy
+
+
+def template_refills(num_dispenses, vol, max_volume, disposal_vol):
+    """(start, new tip, aspirated) for each refill of the ARTBot template's
+    distribute_to_agar, in exact arithmetic."""
+    vol, max_volume, disposal_vol = Fraction(vol), Fraction(max_volume), Fraction(disposal_vol)
+    refills = []
+    current = Fraction(0)
+    needs_new_tip = True
+    for cnt in range(num_dispenses):
+        if (cnt + 1) % 150 == 0:
+            needs_new_tip = True
+        if current < vol + disposal_vol:
+            new_tip = needs_new_tip
+            if needs_new_tip:
+                current = Fraction(0)
+                needs_new_tip = False
+            remaining_vol = (num_dispenses - cnt) * vol
+            if remaining_vol + disposal_vol > max_volume:
+                aspirated = ((max_volume - disposal_vol) // vol) * vol + disposal_vol - current
+            else:
+                aspirated = remaining_vol + disposal_vol - current
+            current += aspirated
+            refills.append((cnt, new_tip, float(aspirated)))
+        current -= vol
+    return refills
+
+
+@pytest.mark.parametrize('num_dispenses', [1, 19, 20, 149, 150, 151, 152, 299, 300, 301, 1000])
+@pytest.mark.parametrize('vol, max_volume, disposal_vol', [
+    ('0.4', 20, 2), ('0.4', 10, 2), ('0.2', 10, 2), ('0.5', 20, 1), ('1.5', 20, 2),
+])
+def test_plans_follow_the_template(num_dispenses, vol, max_volume, disposal_vol):
+    plan = plan_distribution(num_dispenses, float(vol), max_volume, disposal_vol)
+    planned = [(refill.start, refill.new_tip, refill.aspirate_volume) for refill in plan.refills]
+    expected = template_refills(num_dispenses, vol, max_volume, disposal_vol)
+    assert [(start, new_tip) for start, new_tip, _ in planned] == [(start, new_tip) for start, new_tip, _ in expected]
+    assert [aspirated for _, _, aspirated in planned] == pytest.approx([aspirated for _, _, aspirated in expected])
+    assert plan.refills[-1].stop == num_dispenses
+
+
+def test_dispenses_per_refill():
+    assert dispenses_per_refill(0.4, 20, 2) == 45
+    assert dispenses_per_refill(0.4, 10, 2) == 20
+    with pytest.raises(ValueError):
+        dispenses_per_refill(9, 10, 2)
+
+
+def test_hard_limits_keep_every_tip_within_them():
+    points = np.random.default_rng(0).uniform(-40, 40, (500, 2))
+    policy = TipPolicy(TipLimits(max_dispenses=60, max_travel_mm=2000), hard_limits=True)
+    plan = plan_distribution(500, 0.4, 20, 2, policy=policy, points=points, source=(100.0, 0.0))
+    assert sum(refill.num_dispenses for refill in plan.refills) == 500
+    assert len(plan.tips) == plan.num_tips
+    for usage in plan.tips:
+        assert usage.dispenses <= 60
+        assert usage.travel_mm <= 2000
+
+
+def test_colour_limits():
+    policy = TipPolicy(by_colour={'blue': TipLimits(max_dispenses=30)}, hard_limits=True)
+    assert plan_distribution(90, 0.4, 20, 2, policy=policy, colour='blue').num_tips == 3
+    assert plan_distribution(90, 0.4, 20, 2, policy=policy, colour='red').num_tips == 1
+
+
+def test_travel_limit_needs_points():
+    with pytest.raises(ValueError):
+        plan_distribution(10, 0.4, 20, 2, policy=TipPolicy(TipLimits(max_travel_mm=100)))
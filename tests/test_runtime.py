@@ -0,0 +1,67 @@
+import re
+from types import SimpleNamespace
+
+import numpy as np
+
+# artbot.runtime imports artbot.strokes, which needs the protocol API imported first
+import opentrons.protocol_api  # noqa: F401
+from opentrons.types import Point
+
+from artbot.art import ArtPiece
+from artbot.canvas import CanvasLocations
+from artbot.runtime import load_palette_colors, plan_colours
+
+
+class Protocol:
+    def __init__(self):
+        self.comments = []
+
+    def comment(self, text):
+        self.comments.append(text)
+
+
+class Well:
+    def __init__(self, x, y):
+        self.point = Point(x, y, 0)
+
+    def top(self):
+        return SimpleNamespace(point=self.point)
+
+
+def plan(points, source, finish, optimise_path=True):
+    points = np.column_stack([np.asarray(points, dtype=float), np.zeros(len(points))])
+    protocol = Protocol()
+    pixels_by_color = {'a': CanvasLocations(points, (None,), np.zeros(len(points), dtype=np.intp))}
+    plans = plan_colours(
+        protocol, ArtPiece({'a': {}}, {'a': 'red'}), pixels_by_color, {'a': Well(*source)},
+        SimpleNamespace(max_volume=10), 1.0, 2, optimise_path=optimise_path, finish=finish,
+    )
+    travel = [tuple(map(float, found)) for text in protocol.comments
+              for found in re.findall(r'travel: (\d+) mm -> (\d+) mm', text)]
+    return pixels_by_color['a'].points[:, :2], plans['a'], travel
+
+
+def test_orders_no_shorter_to_finish_are_dropped():
+    # the round trip order of these is shorter, but not once it ends at finish
+    points = [[21.0, 27.7], [80.8, 40.1], [19.0, 61.6]]
+    drawn, distribution, travel = plan(points, (-30.9, -36.2), (-39.5, -13.4))
+    assert drawn.tolist() == points
+    assert travel == []
+    assert distribution == plan(points, (-30.9, -36.2), (-39.5, -13.4), optimise_path=False)[1]
+
+
+def test_plans_never_report_more_travel():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        n = int(rng.integers(3, 40))
+        _, _, travel = plan(rng.uniform(0, 100, (n, 2)), rng.uniform(-50, 150, 2), rng.uniform(-50, 150, 2))
+        assert all(after < before for before, after in travel)
+
+
+def test_palettes_without_pixels_stay_in_plate_order():
+    wells = [Well(x, 0) for x in range(4)]
+    palette = SimpleNamespace(wells=lambda: wells)
+    art = ArtPiece({'a': {}, 'b': {}}, {'a': 'red', 'b': 'blue'})
+    empty = CanvasLocations(np.empty((0, 3)), (), np.empty(0, dtype=np.intp))
+    palette_colors = load_palette_colors(Protocol(), palette, art, {'a': empty, 'b': empty}, per_refill=8)
+    assert palette_colors == {'a': wells[0], 'b': wells[1]}
@@ -0,0 +1,68 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from artbot.paths import path_length
+from artbot.sequence import EXACT_COLOURS, end_near, order_colours, pickup_travel
+
+
+def colours(seed, count):
+    rng = np.random.default_rng(seed)
+    sources = rng.uniform(0, 100, (count, 2))
+    tips = rng.integers(1, 4, count)
+    tip_points = rng.uniform(0, 100, (int(tips.sum()), 2))
+    return sources, tips, tip_points
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_order_is_the_best_of_every_order(seed):
+    sources, tips, tip_points = colours(seed, 5)
+    plan = order_colours(sources, tips, tip_points)
+    best = min(pickup_travel(order, sources, tips, tip_points) for order in permutations(range(5)))
+    assert plan.distance_after == pytest.approx(best)
+    assert plan.distance_after == pytest.approx(pickup_travel(plan.order, sources, tips, tip_points))
+    assert plan.distance_before == pytest.approx(pickup_travel(range(5), sources, tips, tip_points))
+
+
+def test_many_colours_are_never_made_worse():
+    sources, tips, tip_points = colours(0, EXACT_COLOURS + 3)
+    plan = order_colours(sources, tips, tip_points)
+    assert sorted(plan.order.tolist()) == list(range(EXACT_COLOURS + 3))
+    assert plan.distance_after <= plan.distance_before
+
+
+def test_ties_keep_the_design_order():
+    sources = np.array([[50, 50], [50, 50], [50, 50]], dtype=float)
+    plan = order_colours(sources, [1, 2, 1], np.zeros((4, 2)))
+    assert plan.order.tolist() == [0, 1, 2]
+
+
+def test_tips_past_the_racks_count_nothing():
+    sources = np.array([[0, 0], [10, 0]], dtype=float)
+    # one tip left, at the second colour's well
+    plan = order_colours(sources, [1, 1], np.array([[10, 0]]))
+    assert plan.order.tolist() == [1, 0]
+    assert (plan.distance_before, plan.distance_after) == (10, 0)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_end_near_keeps_the_earlier_points(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 80, (40, 2))
+    source, end = (0.0, 0.0), (200.0, 0.0)
+    order = end_near(points, 30, source, end)
+    if order is None:
+        return
+    assert order[:30].tolist() == list(range(30))
+    assert sorted(order.tolist()) == list(range(40))
+    run = np.arange(30, 40)
+    assert path_length(points, order[30:], source, end) < path_length(points, run, source, end)
+
+
+def test_end_near_reorders_only_when_shorter():
+    points = np.array([[1, 0], [2, 0], [3, 0]], dtype=float)
+    assert end_near(points, 0, (0, 0), (4, 0)) is None
+    assert end_near(points, 3, (0, 0), (4, 0)) is None
+    points = np.array([[1, 0], [3, 0], [2, 0]], dtype=float)
+    assert end_near(points, 1, (0, 0), (4, 0)).tolist() == [0, 2, 1]
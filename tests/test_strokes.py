@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+# artbot.strokes needs the protocol API imported first
+import opentrons.protocol_api  # noqa: F401
+import opentrons.simulate
+from opentrons.types import Mount, Point
+
+from artbot.strokes import check_strokes, find_strokes, lattice_cells, stroke
+
+# a row, a diagonal, a jump and a step onto another canvas
+POINTS = np.array([[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0], [4, 1, 0], [5, 2, 0], [9, 9, 0], [10, 9, 0]], dtype=float)
+LABWARE = np.array([0, 0, 0, 0, 0, 0, 0, 1])
+
+
+def test_lattice_cells():
+    cells, groups = lattice_cells(POINTS, LABWARE)
+    assert cells[:6].tolist() == [[0, 0], [1, 0], [2, 0], [3, 0], [4, 1], [5, 2]]
+    # the one pixel on the second canvas is a group of its own
+    assert groups.tolist() == [0, 0, 0, 0, 0, 0, 0, 7]
+
+
+def test_straight_runs_of_neighbours_are_strokes():
+    cells, groups = lattice_cells(POINTS, LABWARE)
+    assert find_strokes(cells, groups) == [(0, 4), (4, 6), (6, 7), (7, 8)]
+    assert find_strokes(cells, groups, 1, 3) == [(1, 3)]
+
+
+def test_steps_up_or_down_end_a_stroke():
+    points = POINTS[:4].copy()
+    points[2:, 2] = 1
+    cells, groups = lattice_cells(points, np.zeros(4))
+    assert find_strokes(cells, groups) == [(0, 2), (2, 4)]
+
+
+def test_a_stroke_dispenses_while_moving():
+    protocol = opentrons.simulate.get_protocol_api('2.13')
+    check_strokes(protocol)
+    tip_rack = protocol.load_labware('opentrons_96_tiprack_20ul', 1)
+    plate = protocol.load_labware('corning_96_wellplate_360ul_flat', 2)
+    pipette = protocol.load_instrument('p20_single_gen2', 'right', tip_racks=[tip_rack])
+    pipette.pick_up_tip()
+    pipette.aspirate(10, plate['A1'])
+    start = plate['A1'].bottom(1)
+    end = start.move(Point(2, 0, 0))
+    pipette.move_to(start)
+    stroke(pipette, 4, end)
+    assert pipette.current_volume == 6
+    assert protocol.commands()[-1].startswith('Stroking 4.0 uL into A1')
+    # the gantry ends the stroke at its end, and the next move starts there
+    position = protocol._core.get_hardware().gantry_position(Mount.RIGHT)
+    assert tuple(position) == pytest.approx(tuple(end.point))
+    assert protocol._core.get_last_location() == end
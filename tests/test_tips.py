@@ -0,0 +1,76 @@
+import pytest
+
+from opentrons import simulate
+
+from artbot.tips import ReverseTipPickUpDirection, TipScheduler
+
+
+@pytest.fixture
+def rack():
+    protocol = simulate.get_protocol_api('2.8')
+    return ReverseTipPickUpDirection(protocol.load_labware('opentrons_96_tiprack_20ul', 1))
+
+
+def take(rack, num_tips=1, starting_tip=None):
+    well = rack.next_tip(num_tips, starting_tip)
+    rack.use_tips(well, num_tips)
+    return well.well_name
+
+
+def test_single_tips_bottom_up_right_to_left(rack):
+    names = [take(rack) for _ in range(10)]
+    assert names == ['H12', 'G12', 'F12', 'E12', 'D12', 'C12', 'B12', 'A12', 'H11', 'G11']
+    assert rack.tips_remaining == 86
+
+
+def test_several_tips_return_the_back_nozzle_well(rack):
+    assert take(rack, 3) == 'F12'
+    assert [well.well_name for well in rack.wells() if not well.has_tip] == ['F12', 'G12', 'H12']
+    assert take(rack, 3) == 'C12'
+    # two tips left in the column, so the next three come from the one before
+    assert take(rack, 3) == 'F11'
+    assert take(rack, 2) == 'A12'
+
+
+def test_starting_tip_ends_the_run(rack):
+    assert take(rack, 3, rack['H11']) == 'F11'
+    assert take(rack, 1, rack['A1']) == 'H12'
+
+
+def test_upcoming_tips_takes_none(rack):
+    upcoming = [well.well_name for well in rack.upcoming_tips(5, 3)]
+    assert rack.tips_remaining == 96
+    taken = []
+    for _ in range(5):
+        well = rack.next_tips(3)
+        rack.use_tips(well, 3)
+        taken.append(well.well_name)
+    assert upcoming == taken
+
+
+def test_tips_taken_through_the_core_are_skipped():
+    protocol = simulate.get_protocol_api('2.8')
+    labware = protocol.load_labware('opentrons_96_tiprack_20ul', 1)
+    rack = ReverseTipPickUpDirection(labware)
+    assert take(rack) == 'H12'
+    labware.use_tips(labware['G12'])
+    assert take(rack) == 'F12'
+    rack.reset()
+    assert rack.tips_remaining == 96
+    assert take(rack) == 'H12'
+
+
+def test_scheduler_moves_on_when_a_rack_is_empty():
+    protocol = simulate.get_protocol_api('2.8')
+    racks = [ReverseTipPickUpDirection(protocol.load_labware('opentrons_96_tiprack_20ul', slot)) for slot in (1, 2)]
+    scheduler = TipScheduler(racks)
+    assert scheduler.racks_needed(96) == 1
+    assert scheduler.racks_needed(97) == 2
+    assert scheduler.racks_needed(300) == 4
+    rack, well = scheduler.next_tip()
+    assert (rack, well.well_name) == (racks[0], 'H12')
+    for column in racks[0].columns():
+        racks[0].use_tips(column[0], 8)
+    rack, well = scheduler.next_tip()
+    assert (rack, well.well_name) == (racks[1], 'H12')
+    assert scheduler.tips_remaining == 96
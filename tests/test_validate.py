@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from artbot.art import ArtPiece
+from artbot.validate import close_pair_chunks, close_pairs, droplet_diameter, validate_art
+
+
+def brute_close_pairs(xy, distance):
+    offsets = xy[:, None] - xy[None]
+    close = np.einsum('ijk,ijk->ij', offsets, offsets) < distance * distance
+    return set(zip(*(a.tolist() for a in np.nonzero(np.triu(close, 1)))))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_close_pairs_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-5, 5, (400, 2))
+    # repeated points, and points on cell edges
+    xy[rng.integers(0, 400, 60)] = xy[0]
+    xy[:20] = np.round(xy[:20] / 0.7) * 0.7
+    i, j = close_pairs(xy, 0.7)
+    pairs = list(zip(i.tolist(), j.tolist()))
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == brute_close_pairs(xy, 0.7)
+
+
+def test_chunks_hold_the_same_pairs():
+    xy = np.repeat(np.random.default_rng(0).uniform(-3, 3, (40, 2)), 10, axis=0)
+    chunks = list(close_pair_chunks(xy, 1.0, chunk=50))
+    assert len(chunks) > 1
+    pairs = {pair for i, j in chunks for pair in zip(i.tolist(), j.tolist())}
+    assert pairs == brute_close_pairs(xy, 1.0)
+
+
+def test_no_pairs():
+    assert [len(a) for a in close_pairs(np.zeros((1, 2)), 1.0)] == [0, 0]
+    assert [len(a) for a in close_pairs(np.array([[0, 0], [5, 5]], dtype=float), 1.0)] == [0, 0]
+
+
+def test_findings():
+    pitch = 2 * droplet_diameter(0.4) / 40
+    art = ArtPiece(
+        {
+            '1': {'a': np.array([[0, 0, 0.99], [0, 0, 0.99], [pitch, 0, 0.99], [1.5, 0, 0.99]])},
+            '2': {'a': np.array([[pitch, 0, 0.99], [pitch * 1.4, 0, 0.99]])},
+        },
+        {'1': 'red', '2': 'blue'},
+    )
+    report = validate_art(art, 0.4)
+    counts = {finding.kind: finding.count for finding in report.findings}
+    assert counts == {'out': 1, 'duplicates': 1, 'collisions': 1, 'overlaps': 1}
+    assert not report.ok
+
+
+def test_crowded_pixels_are_an_error():
+    spacing = droplet_diameter(0.4) / 4 / 40
+    art = ArtPiece({'1': {'a': np.array([[0, 0, 0.99], [spacing, 0, 0.99]])}}, {'1': 'red'})
+    report = validate_art(art, 0.4)
+    assert [(finding.kind, finding.count) for finding in report.findings] == [('crowded', 1)]
+    assert not report.ok